@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import Any
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+logger = logging.getLogger(__name__)
+
+
+class Overloaded(Exception):
+    def __init__(self, lane: str, retry_after: int) -> None:
+        super().__init__(f"Too many requests for {lane}")
+        self.lane = lane
+        self.retry_after = retry_after
+
+
+def parse_route_limits(value: str | None) -> dict[str, tuple[int, int]]:
+    # "/api/youtube/transcribe=2:8,/api/browser-use=4:16" -> {prefix: (concurrency, queue)}
+    limits: dict[str, tuple[int, int]] = {}
+    for item in (value or "").split(","):
+        prefix, _, spec = item.strip().partition("=")
+        if not prefix or not spec:
+            continue
+        concurrency, _, queue = spec.partition(":")
+        try:
+            limits[prefix.rstrip("/")] = (max(int(concurrency), 1), max(int(queue or 0), 0))
+        except ValueError:
+            logger.warning("Ignoring malformed admission limit %r", item)
+    return limits
+
+
+class AdmissionLimit:
+    def __init__(self, name: str, concurrency: int, queue_size: int, max_wait_sec: float) -> None:
+        self.name = name
+        self.concurrency = max(concurrency, 1)
+        self.queue_size = max(queue_size, 0)
+        self.max_wait_sec = max_wait_sec
+        self.in_flight = 0
+        self.admitted = 0
+        self.shed = 0
+        self.timed_out = 0
+        self.wait_sec = 0.0
+        self._waiters: deque[asyncio.Future] = deque()
+        # Moving average of how long an admitted request holds its slot; drives Retry-After.
+        self._service_sec: float | None = None
+
+    @property
+    def depth(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    def retry_after(self) -> int:
+        per_request = self._service_sec if self._service_sec is not None else 1.0
+        return max(1, math.ceil(per_request * (self.depth + 1) / self.concurrency))
+
+    async def acquire(self) -> None:
+        if self.in_flight < self.concurrency and not self.depth:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+        if self.depth >= self.queue_size:
+            self.shed += 1
+            raise Overloaded(self.name, self.retry_after())
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        began = time.monotonic()
+        try:
+            await asyncio.wait_for(future, timeout=self.max_wait_sec)
+        except asyncio.TimeoutError:
+            self._abandon(future)
+            self.timed_out += 1
+            raise Overloaded(self.name, self.retry_after()) from None
+        except asyncio.CancelledError:
+            self._abandon(future)
+            raise
+        self.admitted += 1
+        self.wait_sec += time.monotonic() - began
+
+    def _abandon(self, future: asyncio.Future) -> None:
+        if future.done() and not future.cancelled():
+            # The slot was handed over just as the waiter gave up; pass it on.
+            self.release()
+            return
+        future.cancel()
+        try:
+            self._waiters.remove(future)
+        except ValueError:
+            pass
+
+    def release(self, held_sec: float | None = None) -> None:
+        if held_sec is not None:
+            self._service_sec = held_sec if self._service_sec is None else 0.8 * self._service_sec + 0.2 * held_sec
+        # The slot goes straight to the oldest waiter, so in_flight only drops when nobody is queued.
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "in_flight": self.in_flight,
+            "queue_depth": self.depth,
+            "queue_size": self.queue_size,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "timed_out": self.timed_out,
+            "avg_wait_ms": round(self.wait_sec / self.admitted * 1000, 1) if self.admitted else None,
+            "avg_service_ms": round(self._service_sec * 1000, 1) if self._service_sec is not None else None,
+        }
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        routes: dict[str, tuple[int, int]],
+        *,
+        concurrency: int = 64,
+        queue_size: int = 256,
+        max_wait_sec: float = 30.0,
+        priority_paths: list[str] | None = None,
+    ) -> None:
+        # Longest prefix first, so /api/browser-use/extract-many can be limited apart from /api/browser-use.
+        self.routes = [
+            (prefix, AdmissionLimit(prefix, route_concurrency, route_queue, max_wait_sec))
+            for prefix, (route_concurrency, route_queue) in sorted(routes.items(), key=lambda item: -len(item[0]))
+        ]
+        self.default = AdmissionLimit("default", concurrency, queue_size, max_wait_sec)
+        self.priority_paths = tuple(path.rstrip("/") for path in (priority_paths or []) if path)
+        self.priority_served = 0
+
+    @staticmethod
+    def _matches(path: str, prefix: str) -> bool:
+        return path == prefix or path.startswith(prefix + "/")
+
+    def lane(self, path: str) -> AdmissionLimit | None:
+        # Only the API is admission-controlled; the static UI is served as-is.
+        if not path.startswith("/api/"):
+            return None
+        if any(self._matches(path, priority) for priority in self.priority_paths):
+            self.priority_served += 1
+            return None
+        for prefix, limit in self.routes:
+            if self._matches(path, prefix):
+                return limit
+        return self.default
+
+    def stats(self) -> dict[str, Any]:
+        lanes = {prefix: limit.stats() for prefix, limit in self.routes}
+        lanes["default"] = self.default.stats()
+        return {
+            "priority_served": self.priority_served,
+            "queue_depth": sum(lane["queue_depth"] for lane in lanes.values()),
+            "shed": sum(lane["shed"] + lane["timed_out"] for lane in lanes.values()),
+            "lanes": lanes,
+        }
+
+
+class AdmissionMiddleware:
+    # Priority paths skip every lane, so health and status checks answer instantly however busy the
+    # tool routes are; route lanes bound the expensive tools, and the default lane bounds the rest of the API.
+    def __init__(self, app: ASGIApp, *, controller: AdmissionController) -> None:
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        limit = self.controller.lane(scope["path"])
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+        try:
+            await limit.acquire()
+        except Overloaded as exc:
+            response = JSONResponse(
+                {"ok": False, "error": str(exc), "retry_after": exc.retry_after},
+                status_code=429,
+                headers={"Retry-After": str(exc.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+        began = time.monotonic()
+        try:
+            # Held until the body is fully sent, so streamed transcripts and research count as in flight.
+            await self.app(scope, receive, send)
+        finally:
+            limit.release(time.monotonic() - began)
@@ -1,12 +1,25 @@
 import asyncio
+import functools
+import hashlib
+import hmac
+import json
+import logging
+from collections.abc import AsyncIterator, Coroutine
 from datetime import datetime
-from fastapi import FastAPI
+from typing import Any
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
 from fastapi.staticfiles import StaticFiles
 from bee.config import Settings
 from bee.state import BEEState
 from bee.heartbeat import Heartbeat
 from bee.security import RiskMonitor
+from bee.admission import AdmissionController, AdmissionMiddleware, parse_route_limits
+from bee.cache import DiskCache, TieredCache
+from bee.compression import CompressionMiddleware
+from bee.jobs import JobQueue
 from bee.models import (
     GoalState,
     StatusResponse,
@@ -16,15 +29,43 @@ from bee.models import (
     EvermemConversationMetaPatchRequest,
     WebSearchRequest,
     WebScrapeRequest,
+    WebResearchRequest,
     YouTubeTranscribeRequest,
     BrowserUseExtractRequest,
+    BrowserUseExtractManyRequest,
+    SwarmGenerateRequest,
+    SwarmMapReduceRequest,
+    SwarmPrewarmRequest,
+    JobSubmitRequest,
+    VoiceSynthesizeRequest,
 )
 from bee.personality.engine import Personality
+from bee.responses import FastJSONResponse, FastRoute
+from bee.memory.bulk import ingest_ndjson
 from bee.memory.evermemos import EvermemOS
-from bee.telegram.bot import TelegramBot
+from bee.memory.dedup import ChunkedMemoryWriter, FingerprintIndex
+from bee.swarm.cache import GenerationCache
+from bee.swarm.mapreduce import map_reduce
+from bee.swarm.ollama_swarm import OllamaSwarm, SwarmError
+from bee.swarm.residency import ModelResidency
 from bee.tools.web import WebTools
 from bee.tools.youtube import YouTubeTranscriber
 from bee.tools.browser_use import BrowserUseClient
+from bee.tools.extract import TieredExtractor
+from bee.tools.voice import VoiceClient
+
+
+# uvicorn's general logger, so startup reports print next to its own startup lines.
+logger = logging.getLogger("uvicorn.error")
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    # StreamingResponse watches for a client disconnect by draining receive(), which would swallow
+    # request body chunks the body iterator is still reading; a disconnect surfaces as ClientDisconnect instead.
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
 
 
 def create_app() -> FastAPI:
@@ -43,24 +84,127 @@ def create_app() -> FastAPI:
         role=settings.evermem_role,
         scene=settings.evermem_scene,
     )
+    memory_writer = ChunkedMemoryWriter(
+        evermem,
+        FingerprintIndex(settings.memory_fingerprint_path, max_distance=settings.memory_dedup_distance),
+        max_tokens=settings.memory_chunk_tokens,
+    )
     web_tools = WebTools(settings.brave_search_api_key, settings.brave_search_endpoint)
-    youtube = YouTubeTranscriber(settings.openai_api_key, settings.openai_transcribe_model)
-    browser_use = BrowserUseClient(settings.browser_use_api_key, settings.browser_use_llm)
+    youtube = YouTubeTranscriber(
+        settings.openai_api_key,
+        settings.openai_transcribe_model,
+        segment_sec=settings.youtube_segment_sec,
+        overlap_sec=settings.youtube_segment_overlap_sec,
+        max_workers=settings.youtube_transcribe_workers,
+        cache=(
+            DiskCache(settings.youtube_cache_dir, max_bytes=settings.youtube_cache_max_mb * 1024 * 1024)
+            if settings.youtube_cache_dir
+            else None
+        ),
+        preprocess=settings.youtube_preprocess,
+        audio_bitrate=settings.youtube_audio_bitrate,
+        trim_silence=settings.youtube_trim_silence,
+        preprocess_workers=settings.youtube_preprocess_workers,
+    )
+    browser_use = BrowserUseClient(
+        settings.browser_use_api_key,
+        settings.browser_use_llm,
+        concurrency=settings.browser_use_concurrency,
+        cache_ttl_sec=settings.browser_use_cache_ttl_sec,
+        reuse_sessions=settings.browser_use_reuse_sessions,
+    )
+    extractor = TieredExtractor(
+        web_tools,
+        browser_use,
+        routes_path=settings.extract_routes_path,
+        min_chars=settings.extract_min_chars,
+        min_quality=settings.extract_min_quality,
+    )
+    voice = VoiceClient(
+        settings.elevenlabs_api_key,
+        endpoint=settings.elevenlabs_endpoint,
+        voice_id=settings.elevenlabs_voice_id,
+        model_id=settings.elevenlabs_model_id,
+        concurrency=settings.voice_concurrency,
+        cache=(
+            TieredCache(
+                DiskCache(
+                    settings.voice_cache_dir,
+                    max_bytes=settings.voice_cache_max_mb * 1024 * 1024,
+                    compress=False,
+                ),
+                hot_max_bytes=settings.voice_cache_hot_mb * 1024 * 1024,
+            )
+            if settings.voice_cache_dir
+            else None
+        ),
+    )
+    swarm = OllamaSwarm(
+        settings.ollama_endpoints or settings.ollama_endpoint,
+        settings.ollama_model,
+        max_concurrency=settings.ollama_node_concurrency,
+        retries=settings.ollama_retries,
+        residency=ModelResidency(
+            window_sec=max(settings.heartbeat_interval_sec * 10, 300),
+            hot_threshold=settings.ollama_hot_threshold,
+            min_keep_alive_sec=settings.ollama_keep_alive_min_sec,
+            max_keep_alive_sec=settings.ollama_keep_alive_max_sec,
+            pinned=settings.ollama_prewarm_models,
+        ),
+    )
+    if settings.swarm_cache_dir:
+        swarm.cache = GenerationCache(
+            DiskCache(
+                settings.swarm_cache_dir,
+                max_bytes=settings.swarm_cache_max_mb * 1024 * 1024,
+                ttl_sec=settings.swarm_cache_ttl_sec,
+            ),
+            embed=(
+                functools.partial(swarm.embed, model=settings.swarm_semantic_model)
+                if settings.swarm_semantic_model
+                else None
+            ),
+            semantic_threshold=settings.swarm_semantic_threshold,
+            semantic_scan_limit=settings.swarm_semantic_scan_limit,
+            semantic_path=settings.swarm_semantic_index_path,
+        )
+    jobs = JobQueue(settings.jobs_path)
 
-    app = FastAPI(title="B.E.E.")
+    app = FastAPI(title="B.E.E.", default_response_class=FastJSONResponse)
+    app.router.route_class = FastRoute
     app.state.settings = settings
     app.state.state = state
     app.state.personality = personality
     app.state.heartbeat = heartbeat
     app.state.risk_monitor = risk_monitor
     app.state.evermemos = evermem
+    app.state.memory_writer = memory_writer
+    app.state.jobs = jobs
+    app.state.swarm = swarm
 
+    admission_routes = parse_route_limits(settings.admission_route_limits)
+    # Job long-polls have a lane in the ADMISSION_ROUTE_LIMITS default and Telegram webhook deliveries get one here
+    # (following TELEGRAM_WEBHOOK_PATH), so neither can fill the lane shared by the rest of the API.
+    admission_routes.setdefault(
+        settings.telegram_webhook_path.rstrip("/"), (settings.admission_concurrency, settings.admission_queue)
+    )
+    admission = AdmissionController(
+        admission_routes,
+        concurrency=settings.admission_concurrency,
+        queue_size=settings.admission_queue,
+        max_wait_sec=settings.admission_max_wait_sec,
+        priority_paths=settings.admission_priority_paths,
+    )
+    app.state.admission = admission
+    # Added first so it sits inside CORS: 429s still carry the CORS headers the UI needs to read them.
+    app.add_middleware(AdmissionMiddleware, controller=admission)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
         allow_methods=["*"] ,
         allow_headers=["*"],
     )
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.response_compression_min_bytes)
 
     if (static_dir := "../frontend/dist"):
         try:
@@ -68,17 +212,97 @@ def create_app() -> FastAPI:
         except RuntimeError:
             pass
 
+    # Every worker must agree on the secret, so without an explicit one it is derived from the bot token.
+    telegram_secret = settings.telegram_webhook_secret or (
+        hashlib.sha256(f"bee-webhook:{settings.telegram_bot_token}".encode("utf-8")).hexdigest()[:48]
+    )
+
+    # Readiness of the parts that warm up in the background; the heartbeat is read live in /api/ready.
+    readiness: dict[str, dict[str, Any]] = {}
+
+    def set_readiness(component: str, status: str, detail: str | None = None) -> None:
+        readiness[component] = {"status": status, "detail": detail, "since": datetime.utcnow().isoformat()}
+
+    set_readiness("memory", "pending" if evermem.enabled else "disabled")
+    set_readiness("goals", "pending" if evermem.enabled else "disabled")
+    set_readiness("telegram", "pending" if settings.telegram_bot_token else "disabled")
+
+    async def warm_memory() -> None:
+        delay = 2.0
+        while await evermem.ensure_conversation_meta() is None:
+            set_readiness("memory", "retrying", f"EvermemOS unreachable, next attempt in {delay:.0f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60.0)
+        set_readiness("memory", "ready")
+        delay = 2.0
+        # Goals set through the API while this was in flight win over the stored ones.
+        while not state.memory_goals.goals:
+            goals = await evermem.fetch_goals()
+            if goals is not None:
+                if goals and not state.memory_goals.goals:
+                    await state.set_goals(goals)
+                break
+            set_readiness("goals", "retrying", f"Goal fetch failed, next attempt in {delay:.0f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60.0)
+        set_readiness("goals", "ready", f"{len(state.memory_goals.goals)} goals")
+
+    async def warm_up(coro: Coroutine[Any, Any, None], *components: str) -> None:
+        try:
+            await coro
+        except Exception as exc:
+            logger.warning("Warm-up of %s failed", ", ".join(components), exc_info=True)
+            # Parts that finished before the failure stay ready.
+            for component in components:
+                if readiness[component]["status"] != "ready":
+                    set_readiness(component, "failed", str(exc) or type(exc).__name__)
+
     @app.on_event("startup")
     async def on_startup() -> None:
+        profile = getattr(app.state, "import_profile", None)
+        if profile is not None:
+            slowest = ", ".join(f"{entry['module']} {entry['ms']:.0f} ms" for entry in profile["modules"][:8])
+            logger.info("Imports took %.0f ms: %s", profile["total_ms"], slowest)
+            if profile["total_ms"] > settings.startup_budget_ms:
+                logger.warning(
+                    "Import time %.0f ms is over the %s ms startup budget", profile["total_ms"], settings.startup_budget_ms
+                )
+
+        app.state.warmup_tasks = []
         if settings.telegram_bot_token:
-            bot = TelegramBot(settings.telegram_bot_token, state)
-            app.state.telegram_task = bot.run_in_background()
+            # aiogram alone costs seconds of import time, so it is only loaded when a bot is configured.
+            from bee.telegram.bot import TelegramBot
+
+            bot = TelegramBot(
+                settings.telegram_bot_token,
+                state,
+                admin_chat_id=settings.telegram_admin_chat_id,
+                update_concurrency=settings.telegram_update_concurrency,
+                global_rate=settings.telegram_global_rate,
+                chat_rate=settings.telegram_chat_rate,
+                chat_burst=settings.telegram_chat_burst,
+                evermem=evermem,
+                web_tools=web_tools,
+                swarm=swarm,
+                transcriber=youtube,
+                voice_downloads=settings.telegram_voice_downloads,
+            )
+            app.state.telegram = bot
+            webhook_url = (
+                settings.telegram_webhook_url.rstrip("/") + settings.telegram_webhook_path
+                if settings.telegram_webhook_url
+                else None
+            )
+
+            async def warm_telegram() -> None:
+                set_readiness("telegram", "ready", await bot.start(webhook_url, telegram_secret))
+
+            # Webhook registration and EvermemOS calls can each take up to their timeouts, so they run
+            # after the server starts accepting traffic; /api/ready reports when they are done.
+            app.state.warmup_tasks.append(asyncio.create_task(warm_up(warm_telegram(), "telegram")))
 
         if evermem.enabled:
-            await evermem.ensure_conversation_meta()
-            goals = await evermem.fetch_goals()
-            if goals:
-                await state.set_goals(goals)
+            app.state.warmup_tasks.append(asyncio.create_task(warm_up(warm_memory(), "memory", "goals")))
 
         async def memory_thump() -> None:
             before = state.memory_goals.before_tick
@@ -87,14 +311,96 @@ def create_app() -> FastAPI:
             state.last_tick = datetime.utcnow()
             await evermem.record_state(before, tick, after, state.memory_goals.goals)
 
+        async def swarm_prewarm_thump() -> None:
+            # Runs ahead of the other thumps; the load itself happens in the background so the tick is not held up.
+            task = getattr(app.state, "swarm_prewarm_task", None)
+            if task is not None and not task.done():
+                return
+
+            hot = swarm.residency.hot_models()
+            if not hot:
+                return
+
+            async def warm() -> None:
+                await swarm.refresh_residency()
+                await swarm.prewarm(hot)
+
+            app.state.swarm_prewarm_task = asyncio.create_task(warm())
+
+        heartbeat.register_thump(swarm_prewarm_thump)
         heartbeat.register_thump(memory_thump)
         await heartbeat.start()
         state.heartbeat_running = True
+        await jobs.start()
+
+        if voice.enabled and settings.voice_prewarm_phrases:
+            app.state.voice_prewarm_task = asyncio.create_task(voice.prewarm(settings.voice_prewarm_phrases))
+
+    @app.on_event("shutdown")
+    async def on_shutdown() -> None:
+        for task in getattr(app.state, "warmup_tasks", []):
+            task.cancel()
+        await asyncio.gather(*getattr(app.state, "warmup_tasks", []), return_exceptions=True)
+        # Stop everything that can still start work first; the bot and the job workers finish theirs next,
+        # and only then are the pools and clients they use closed.
+        await heartbeat.stop()
+        state.heartbeat_running = False
+        prewarm_tasks = [
+            task
+            for task in (getattr(app.state, "swarm_prewarm_task", None), getattr(app.state, "voice_prewarm_task", None))
+            if task is not None
+        ]
+        for task in prewarm_tasks:
+            task.cancel()
+        await asyncio.gather(*prewarm_tasks, return_exceptions=True)
+        if getattr(app.state, "telegram", None) is not None:
+            await app.state.telegram.close()
+        await jobs.stop()
+        await youtube.close()
+        await browser_use.close()
+        await swarm.close()
+
+    @app.post(settings.telegram_webhook_path, response_model=None)
+    async def telegram_webhook(request: Request) -> JSONResponse | dict:
+        bot = getattr(app.state, "telegram", None)
+        if bot is None or bot.mode != "webhook":
+            return JSONResponse({"ok": False, "error": "Telegram webhook not active"}, status_code=404)
+        token = request.headers.get("X-Telegram-Bot-Api-Secret-Token", "")
+        if not hmac.compare_digest(token, telegram_secret):
+            return JSONResponse({"ok": False, "error": "Invalid secret token"}, status_code=403)
+        try:
+            accepted = bot.feed_webhook(await request.json())
+        except (ValueError, ValidationError):
+            return JSONResponse({"ok": False, "error": "Malformed update"}, status_code=400)
+        if not accepted:
+            return JSONResponse({"ok": False, "error": "Busy"}, status_code=503, headers={"Retry-After": "1"})
+        return {"ok": True}
+
+    @app.get("/api/telegram/stats")
+    async def telegram_stats() -> dict:
+        bot = getattr(app.state, "telegram", None)
+        return {"ok": bot is not None, "stats": bot.stats() if bot is not None else None}
 
     @app.get("/api/health")
     async def health() -> dict:
         return {"status": "ok"}
 
+    @app.get("/api/ready", response_model=None)
+    async def ready() -> JSONResponse | dict:
+        components = {
+            **readiness,
+            "heartbeat": {"status": "ready" if state.heartbeat_running else "stopped"},
+        }
+        # A heartbeat stopped on purpose does not make the instance unready.
+        ok = all(entry["status"] in ("ready", "disabled", "stopped") for entry in components.values())
+        if not ok:
+            return JSONResponse({"ok": False, "components": components}, status_code=503)
+        return {"ok": True, "components": components}
+
+    @app.get("/api/admission/stats")
+    async def admission_stats() -> dict:
+        return {"ok": True, "stats": admission.stats()}
+
     @app.get("/api/status", response_model=StatusResponse)
     async def status() -> StatusResponse:
         return StatusResponse(
@@ -152,6 +458,23 @@ def create_app() -> FastAPI:
         )
         return {"ok": bool(result), "result": result}
 
+    @app.post("/api/evermem/memories/bulk")
+    async def add_memories_bulk(request: Request) -> DuplexStreamingResponse:
+        # Body is NDJSON, one EvermemAddRequest per line; results stream back per line as they are stored.
+        async def events():
+            if not evermem.enabled:
+                yield json.dumps({"type": "done", "ok": False, "error": "EvermemOS is not configured"}) + "\n"
+                return
+            async for event in ingest_ndjson(
+                request.stream(),
+                evermem,
+                batch_size=settings.memory_bulk_batch_size,
+                concurrency=settings.memory_bulk_concurrency,
+            ):
+                yield json.dumps(event) + "\n"
+
+        return DuplexStreamingResponse(events(), media_type="application/x-ndjson")
+
     @app.post("/api/evermem/search")
     async def search_memories(payload: EvermemSearchRequest) -> dict:
         query = payload.query or payload.search_query
@@ -216,36 +539,271 @@ def create_app() -> FastAPI:
 
     @app.post("/api/web/scrape")
     async def web_scrape(payload: WebScrapeRequest) -> dict:
-        result = await web_tools.scrape(payload.url, max_chars=payload.max_chars or 20000)
+        result = await web_tools.scrape(
+            payload.url, max_chars=payload.max_chars or 20000, extract=bool(payload.extract)
+        )
         return {"ok": True, "result": result}
 
+    @app.post("/api/web/research")
+    async def web_research(payload: WebResearchRequest) -> StreamingResponse:
+        async def events() -> AsyncIterator[str]:
+            collected: list[dict] = []
+            async for event in web_tools.research(
+                payload.query,
+                count=payload.count or 5,
+                scrape_top=payload.scrape_top if payload.scrape_top is not None else 3,
+                max_chars=payload.max_chars or 20000,
+                country=payload.country or "US",
+                search_lang=payload.search_lang or "en",
+                deadline_sec=payload.deadline_sec,
+            ):
+                if event["type"] == "result" and event.get("content"):
+                    collected.append(event)
+                yield json.dumps(event) + "\n"
+
+            if payload.store_memory and collected and evermem.enabled:
+                sections = [f"Web research: {payload.query}"]
+                for item in sorted(collected, key=lambda entry: entry.get("rank", 0)):
+                    header = f"Source: {item['url']}"
+                    if item.get("title"):
+                        header += f"\nTitle: {item['title']}"
+                    sections.append(f"{header}\n\n{item['content']}")
+                result = await evermem.add_memory(content="\n\n".join(sections))
+                yield json.dumps({"type": "memory", "ok": bool(result), "result": result}) + "\n"
+
+        return StreamingResponse(events(), media_type="application/x-ndjson")
+
     @app.post("/api/youtube/transcribe")
     async def youtube_transcribe(payload: YouTubeTranscribeRequest) -> dict:
         result = await youtube.transcribe(payload.video)
         if payload.store_memory and result.get("ok") and evermem.enabled:
             title = result.get("title") or payload.video
-            content = f"YouTube transcription: {title}\n\n{result.get('text', '')}"
-            await evermem.add_memory(content=content)
+            result["memory"] = await memory_writer.store(
+                f"YouTube transcription: {title}", result.get("text", "")
+            )
         return result
 
+    @app.post("/api/youtube/transcribe/stream")
+    async def youtube_transcribe_stream(payload: YouTubeTranscribeRequest) -> StreamingResponse:
+        async def events() -> AsyncIterator[str]:
+            async for event in youtube.transcribe_stream(payload.video):
+                if event["type"] == "done" and payload.store_memory and event.get("ok") and evermem.enabled:
+                    title = event.get("title") or payload.video
+                    event["memory"] = await memory_writer.store(
+                        f"YouTube transcription: {title}", event.get("text", "")
+                    )
+                yield json.dumps(event) + "\n"
+
+        return StreamingResponse(events(), media_type="application/x-ndjson")
+
     @app.post("/api/browser-use/extract")
     async def browser_use_extract(payload: BrowserUseExtractRequest) -> dict:
-        result = await browser_use.extract_text(payload.url)
+        result = await extractor.extract(payload.url, force_browser=bool(payload.force_browser))
         if payload.store_memory and result.get("ok") and evermem.enabled:
             output = result.get("output") or {}
             title = output.get("title") if isinstance(output, dict) else None
             summary = output.get("summary") if isinstance(output, dict) else None
             text = output.get("text") if isinstance(output, dict) else None
-            sections = [f"Browser-use extract: {payload.url}"]
+            header = f"Browser-use extract: {payload.url}"
             if title:
-                sections.append(f"Title: {title}")
-            if summary:
-                sections.append(f"Summary: {summary}")
+                header += f"\nTitle: {title}"
+            sections = [f"Summary: {summary}"] if summary else []
             if text:
                 sections.append(text)
-            await evermem.add_memory(content="\n\n".join(sections))
+            result["memory"] = await memory_writer.store(header, "\n\n".join(sections))
         return result
 
+    @app.post("/api/voice/synthesize", response_model=None)
+    async def voice_synthesize(payload: VoiceSynthesizeRequest) -> StreamingResponse | dict:
+        if not voice.enabled:
+            return {"ok": False, "error": "ELEVENLABS_API_KEY not set"}
+        chunks = voice.synthesize_stream(payload.text)
+        # Pull the first chunk up front so upstream failures surface as a JSON error, not a cut stream.
+        try:
+            first = await anext(chunks)
+        except StopAsyncIteration:
+            return {"ok": False, "error": "Nothing to synthesize"}
+        except Exception as exc:
+            await chunks.aclose()
+            return {"ok": False, "error": str(exc)}
+
+        async def audio() -> AsyncIterator[bytes]:
+            yield first
+            async for chunk in chunks:
+                yield chunk
+
+        return StreamingResponse(audio(), media_type="audio/mpeg")
+
+    @app.get("/api/voice/cache")
+    async def voice_cache_stats() -> dict:
+        if voice.cache is None:
+            return {"ok": False, "error": "Voice cache disabled"}
+        return {"ok": True, "stats": voice.cache.stats()}
+
+    @app.post("/api/voice/prewarm")
+    async def voice_prewarm(payload: dict) -> dict:
+        if not voice.enabled:
+            return {"ok": False, "error": "ELEVENLABS_API_KEY not set"}
+        phrases = payload.get("phrases") or settings.voice_prewarm_phrases
+        warmed = await voice.prewarm([str(phrase) for phrase in phrases])
+        return {"ok": True, "warmed": warmed}
+
+    job_requests = {
+        "youtube.transcribe": (YouTubeTranscribeRequest, youtube_transcribe),
+        "browser_use.extract": (BrowserUseExtractRequest, browser_use_extract),
+    }
+    job_concurrency = {
+        "youtube.transcribe": settings.jobs_youtube_workers,
+        "browser_use.extract": settings.jobs_browser_use_workers,
+    }
+    for tool, (request_model, endpoint) in job_requests.items():
+        async def run_job(payload: dict, request_model=request_model, endpoint=endpoint) -> dict:
+            return await endpoint(request_model(**payload))
+
+        jobs.register(tool, run_job, concurrency=job_concurrency[tool])
+
+    @app.post("/api/jobs")
+    async def submit_job(payload: JobSubmitRequest) -> dict:
+        if payload.tool not in job_requests:
+            return {"ok": False, "error": f"Unknown tool; expected one of {sorted(job_requests)}"}
+        request_model, _ = job_requests[payload.tool]
+        try:
+            normalized = request_model(**payload.payload).model_dump()
+        except ValidationError as exc:
+            return {"ok": False, "error": str(exc)}
+        job, created = await jobs.submit(payload.tool, normalized)
+        return {"ok": True, "deduplicated": not created, "job": job.to_dict()}
+
+    @app.get("/api/jobs")
+    async def list_jobs(tool: str | None = None, status: str | None = None) -> dict:
+        return {
+            "ok": True,
+            "jobs": [job.to_dict() for job in jobs.list_jobs(tool=tool, status=status)],
+            "stats": jobs.stats(),
+        }
+
+    @app.get("/api/jobs/{job_id}")
+    async def get_job(job_id: str, wait: float = 0) -> dict:
+        job = await jobs.wait(job_id, timeout=min(max(wait, 0), settings.jobs_max_wait_sec))
+        if job is None:
+            return {"ok": False, "error": "Job not found"}
+        return {"ok": True, "job": job.to_dict()}
+
+    @app.delete("/api/jobs/{job_id}")
+    async def cancel_job(job_id: str) -> dict:
+        job = await jobs.cancel(job_id)
+        if job is None:
+            return {"ok": False, "error": "Job not found"}
+        return {"ok": True, "job": job.to_dict()}
+
+    @app.post("/api/browser-use/extract-many", response_model=None)
+    async def browser_use_extract_many(payload: BrowserUseExtractManyRequest) -> StreamingResponse | dict:
+        if not browser_use.enabled:
+            return {"ok": False, "error": "BROWSER_USE_API_KEY not set"}
+
+        async def events() -> AsyncIterator[str]:
+            async for result in browser_use.extract_many(payload.urls):
+                yield json.dumps(result, default=str) + "\n"
+
+        return StreamingResponse(events(), media_type="application/x-ndjson")
+
+    @app.post("/api/swarm/generate")
+    async def swarm_generate(payload: SwarmGenerateRequest) -> dict:
+        try:
+            result = await swarm.generate(
+                payload.prompt,
+                model=payload.model,
+                options=payload.options,
+                priority=payload.priority if payload.priority is not None else 10,
+                cache=payload.cache,
+            )
+        except SwarmError as exc:
+            return {"ok": False, "error": str(exc)}
+        return {"ok": True, "result": result}
+
+    @app.post("/api/swarm/generate/stream")
+    async def swarm_generate_stream(payload: SwarmGenerateRequest) -> StreamingResponse:
+        async def events() -> AsyncIterator[str]:
+            # Starlette cancels this generator when the client disconnects, which aborts the upstream call.
+            stream = swarm.generate_stream(
+                payload.prompt,
+                model=payload.model,
+                options=payload.options,
+                priority=payload.priority if payload.priority is not None else 10,
+                cache=payload.cache,
+            )
+            try:
+                async for event in stream:
+                    yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+            except SwarmError as exc:
+                yield f"event: error\ndata: {json.dumps({'type': 'error', 'error': str(exc)})}\n\n"
+            finally:
+                await stream.aclose()
+
+        return StreamingResponse(
+            events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    @app.post("/api/swarm/map-reduce")
+    async def swarm_map_reduce(payload: SwarmMapReduceRequest) -> StreamingResponse:
+        async def events() -> AsyncIterator[str]:
+            documents: list[tuple[str, str]] = [
+                (f"text:{index}", text) for index, text in enumerate(payload.texts or []) if text.strip()
+            ]
+            if payload.memory_query and evermem.enabled:
+                contents = await evermem.search_contents(payload.memory_query, top_k=payload.memory_top_k or 20)
+                documents.extend((f"memory:{index}", content) for index, content in enumerate(contents))
+                yield json.dumps({"type": "source", "kind": "memory", "ok": True, "count": len(contents)}) + "\n"
+            if payload.urls:
+                urls = list(dict.fromkeys(payload.urls))
+                # The HTTP tier has no limit of its own, so the fetches are bounded here.
+                limit = asyncio.Semaphore(max(settings.swarm_map_reduce_url_concurrency, 1))
+
+                async def extract(url: str) -> dict[str, Any]:
+                    async with limit:
+                        return await extractor.extract(url)
+
+                extracted = await asyncio.gather(*(extract(url) for url in urls))
+                for url, result in zip(urls, extracted):
+                    text = ((result.get("output") or {}) if result.get("ok") else {}).get("text") or ""
+                    if text:
+                        documents.append((url, text))
+                    yield json.dumps(
+                        {"type": "source", "kind": "url", "url": url, "ok": bool(text), "error": result.get("error")}
+                    ) + "\n"
+
+            async for event in map_reduce(
+                swarm,
+                documents,
+                payload.map_prompt,
+                payload.reduce_prompt,
+                model=payload.model,
+                options=payload.options,
+                concurrency=payload.concurrency or swarm.capacity,
+                chunk_tokens=payload.chunk_tokens or 1500,
+                fan_in=payload.fan_in or 4,
+                max_reduce_chars=payload.max_reduce_chars or 12000,
+            ):
+                yield json.dumps(event) + "\n"
+
+        return StreamingResponse(events(), media_type="application/x-ndjson")
+
+    @app.post("/api/swarm/prewarm")
+    async def swarm_prewarm(payload: SwarmPrewarmRequest) -> dict:
+        await swarm.refresh_residency()
+        warmed = await swarm.prewarm(payload.models)
+        return {"ok": True, "warmed": warmed, "residency": swarm.residency.to_dict()}
+
+    @app.get("/api/swarm/stats")
+    async def swarm_stats() -> dict:
+        return {"ok": True, "stats": swarm.stats()}
+
+    @app.get("/api/extract/stats")
+    async def extract_stats() -> dict:
+        return {"ok": True, "stats": extractor.stats()}
+
     @app.post("/api/tick")
     async def manual_tick(payload: dict) -> dict:
         before = payload.get("before_tick")
@@ -259,7 +817,11 @@ def create_app() -> FastAPI:
     async def log_risk(payload: dict) -> dict:
         action = payload.get("action", "unknown")
         score = int(payload.get("risk_score", 0))
+        was_halted = risk_monitor.halted
         risk_monitor.log(action, score)
+        bot = getattr(app.state, "telegram", None)
+        if bot is not None and risk_monitor.halted and not was_halted:
+            bot.notify(f"Risk halt: {action} scored {score} (tolerance {risk_monitor.tolerance}).", key="risk")
         return {"ok": True, "halted": risk_monitor.halted}
 
     return app
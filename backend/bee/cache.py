@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+
+logger = logging.getLogger(__name__)
+
+
+class DiskCache:
+    def __init__(
+        self,
+        directory: str,
+        *,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl_sec: float | None = None,
+        compress: bool = True,
+    ) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl_sec = ttl_sec
+        self.compress = compress
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # name -> (size, created); ordered least recently used first.
+        self._entries: OrderedDict[str, tuple[int, float]] = OrderedDict()
+        self._total = 0
+        self._scan()
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        raw = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _name(self, key: str) -> str:
+        return f"{key}.gz" if self.compress else key
+
+    def _scan(self) -> None:
+        if not os.path.isdir(self.directory):
+            return
+        found: list[tuple[float, str, int]] = []
+        for entry in os.scandir(self.directory):
+            if not entry.is_file() or entry.name.endswith(".tmp"):
+                continue
+            stat = entry.stat()
+            found.append((stat.st_mtime, entry.name, stat.st_size))
+        for mtime, name, size in sorted(found):
+            self._entries[name] = (size, mtime)
+            self._total += size
+
+    def _drop(self, name: str) -> None:
+        size, _ = self._entries.pop(name, (0, 0.0))
+        self._total -= size
+        try:
+            os.remove(self._path(name))
+        except OSError:
+            pass
+
+    def get(self, key: str) -> bytes | None:
+        name = self._name(key)
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                self.misses += 1
+                return None
+            if self.ttl_sec is not None and time.time() - entry[1] > self.ttl_sec:
+                self._drop(name)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(name)
+        try:
+            with open(self._path(name), "rb") as handle:
+                data = handle.read()
+            if self.compress:
+                data = gzip.decompress(data)
+        except (OSError, EOFError, gzip.BadGzipFile):
+            logger.warning("Cache entry unreadable key=%s", key, exc_info=True)
+            with self._lock:
+                self._drop(name)
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def set(self, key: str, value: bytes) -> None:
+        name = self._name(key)
+        data = gzip.compress(value, compresslevel=6) if self.compress else value
+        if len(data) > self.max_bytes:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(name)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            previous = self._entries.pop(name, None)
+            if previous is not None:
+                self._total -= previous[0]
+            self._entries[name] = (len(data), time.time())
+            self._total += len(data)
+            while self._total > self.max_bytes and self._entries:
+                self._drop(next(iter(self._entries)))
+
+    def get_json(self, key: str) -> Any | None:
+        data = self.get(key)
+        if data is None:
+            return None
+        try:
+            return json.loads(data)
+        except ValueError:
+            return None
+
+    def set_json(self, key: str, value: Any) -> None:
+        self.set(key, json.dumps(value).encode("utf-8"))
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._total,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class TieredCache:
+    def __init__(self, disk: DiskCache, *, hot_max_bytes: int = 16 * 1024 * 1024) -> None:
+        self.disk = disk
+        self.hot_max_bytes = hot_max_bytes
+        self.hot_hits = 0
+        self._hot: OrderedDict[str, bytes] = OrderedDict()
+        self._hot_bytes = 0
+        self._lock = threading.Lock()
+
+    def _remember(self, key: str, value: bytes) -> None:
+        if len(value) > self.hot_max_bytes:
+            return
+        with self._lock:
+            previous = self._hot.pop(key, None)
+            if previous is not None:
+                self._hot_bytes -= len(previous)
+            self._hot[key] = value
+            self._hot_bytes += len(value)
+            while self._hot_bytes > self.hot_max_bytes:
+                _, evicted = self._hot.popitem(last=False)
+                self._hot_bytes -= len(evicted)
+
+    def peek(self, key: str) -> bytes | None:
+        with self._lock:
+            value = self._hot.get(key)
+            if value is not None:
+                self._hot.move_to_end(key)
+                self.hot_hits += 1
+            return value
+
+    def get(self, key: str) -> bytes | None:
+        value = self.peek(key)
+        if value is not None:
+            return value
+        value = self.disk.get(key)
+        if value is not None:
+            self._remember(key, value)
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        self._remember(key, value)
+        self.disk.set(key, value)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "hot_entries": len(self._hot),
+            "hot_bytes": self._hot_bytes,
+            "hot_max_bytes": self.hot_max_bytes,
+            "hot_hits": self.hot_hits,
+            "disk": self.disk.stats(),
+        }
@@ -10,13 +10,70 @@ class Settings(BaseModel):
     env: str = Field(default_factory=lambda: _env("BEE_ENV", "dev"))
     host: str = Field(default_factory=lambda: _env("BEE_HOST", "0.0.0.0"))
     port: int = Field(default_factory=lambda: int(_env("BEE_PORT", "8080")))
+    startup_budget_ms: int = Field(default_factory=lambda: int(_env("BEE_STARTUP_BUDGET_MS", "3000")))
+    response_compression_min_bytes: int = Field(
+        default_factory=lambda: int(_env("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+    )
+    admission_concurrency: int = Field(default_factory=lambda: int(_env("ADMISSION_CONCURRENCY", "64")))
+    admission_queue: int = Field(default_factory=lambda: int(_env("ADMISSION_QUEUE", "256")))
+    admission_max_wait_sec: float = Field(default_factory=lambda: float(_env("ADMISSION_MAX_WAIT_SEC", "30")))
+    admission_route_limits: str = Field(
+        default_factory=lambda: _env(
+            "ADMISSION_ROUTE_LIMITS",
+            "/api/youtube/transcribe=2:8,/api/browser-use=4:16,/api/web/research=4:16,/api/web/scrape=8:32,"
+            "/api/voice/synthesize=4:16,/api/swarm=16:64,/api/evermem/memories/bulk=2:4,/api/jobs=64:256",
+        )
+    )
+    admission_priority_paths: list[str] = Field(
+        default_factory=lambda: [
+            path.strip()
+            for path in _env(
+                "ADMISSION_PRIORITY_PATHS",
+                "/api/health,/api/ready,/api/status,/api/admission/stats,/api/swarm/stats,/api/telegram/stats",
+            ).split(",")
+            if path.strip()
+        ]
+    )
 
     telegram_bot_token: str | None = Field(default_factory=lambda: _env("TELEGRAM_BOT_TOKEN"))
     telegram_admin_chat_id: str | None = Field(default_factory=lambda: _env("TELEGRAM_ADMIN_CHAT_ID"))
+    telegram_webhook_url: str | None = Field(default_factory=lambda: _env("TELEGRAM_WEBHOOK_URL"))
+    telegram_webhook_path: str = Field(default_factory=lambda: _env("TELEGRAM_WEBHOOK_PATH", "/api/telegram/webhook"))
+    telegram_webhook_secret: str | None = Field(default_factory=lambda: _env("TELEGRAM_WEBHOOK_SECRET"))
+    telegram_global_rate: float = Field(default_factory=lambda: float(_env("TELEGRAM_GLOBAL_RATE", "25")))
+    telegram_chat_rate: float = Field(default_factory=lambda: float(_env("TELEGRAM_CHAT_RATE", "1")))
+    telegram_chat_burst: float = Field(default_factory=lambda: float(_env("TELEGRAM_CHAT_BURST", "3")))
+    telegram_voice_downloads: int = Field(default_factory=lambda: int(_env("TELEGRAM_VOICE_DOWNLOADS", "4")))
+    telegram_update_concurrency: int = Field(default_factory=lambda: int(_env("TELEGRAM_UPDATE_CONCURRENCY", "8")))
 
     openai_api_key: str | None = Field(default_factory=lambda: _env("OPENAI_API_KEY"))
     openai_transcribe_model: str = Field(default_factory=lambda: _env("OPENAI_TRANSCRIBE_MODEL", "gpt-4o-mini-transcribe"))
+    youtube_segment_sec: int = Field(default_factory=lambda: int(_env("YOUTUBE_SEGMENT_SEC", "600")))
+    youtube_segment_overlap_sec: int = Field(default_factory=lambda: int(_env("YOUTUBE_SEGMENT_OVERLAP_SEC", "5")))
+    youtube_transcribe_workers: int = Field(default_factory=lambda: int(_env("YOUTUBE_TRANSCRIBE_WORKERS", "4")))
+    youtube_cache_dir: str | None = Field(default_factory=lambda: _env("YOUTUBE_CACHE_DIR", ".bee/transcripts"))
+    youtube_cache_max_mb: int = Field(default_factory=lambda: int(_env("YOUTUBE_CACHE_MAX_MB", "256")))
+    youtube_preprocess: bool = Field(default_factory=lambda: _env("YOUTUBE_PREPROCESS", "1") == "1")
+    youtube_audio_bitrate: str = Field(default_factory=lambda: _env("YOUTUBE_AUDIO_BITRATE", "24k"))
+    youtube_trim_silence: bool = Field(default_factory=lambda: _env("YOUTUBE_TRIM_SILENCE", "1") == "1")
+    youtube_preprocess_workers: int = Field(default_factory=lambda: int(_env("YOUTUBE_PREPROCESS_WORKERS", "2")))
     elevenlabs_api_key: str | None = Field(default_factory=lambda: _env("ELEVENLABS_API_KEY"))
+    elevenlabs_endpoint: str = Field(default_factory=lambda: _env("ELEVENLABS_ENDPOINT", "https://api.elevenlabs.io"))
+    elevenlabs_voice_id: str = Field(default_factory=lambda: _env("ELEVENLABS_VOICE_ID", "default"))
+    elevenlabs_model_id: str | None = Field(default_factory=lambda: _env("ELEVENLABS_MODEL_ID"))
+    voice_concurrency: int = Field(default_factory=lambda: int(_env("VOICE_CONCURRENCY", "3")))
+    voice_cache_dir: str | None = Field(default_factory=lambda: _env("VOICE_CACHE_DIR", ".bee/tts"))
+    voice_cache_max_mb: int = Field(default_factory=lambda: int(_env("VOICE_CACHE_MAX_MB", "128")))
+    voice_cache_hot_mb: int = Field(default_factory=lambda: int(_env("VOICE_CACHE_HOT_MB", "16")))
+    voice_prewarm_phrases: list[str] = Field(
+        default_factory=lambda: [
+            phrase.strip()
+            for phrase in (
+                _env("VOICE_PREWARM_PHRASES", "B.E.E. online.|Heartbeat running.|Heartbeat stopped.") or ""
+            ).split("|")
+            if phrase.strip()
+        ]
+    )
 
     evermem_endpoint: str | None = Field(default_factory=lambda: _env("EVERMEM_ENDPOINT"))
     evermem_api_key: str | None = Field(default_factory=lambda: _env("EVERMEM_API_KEY"))
@@ -27,6 +84,14 @@ class Settings(BaseModel):
     evermem_role: str | None = Field(default_factory=lambda: _env("EVERMEM_ROLE", "assistant"))
     evermem_scene: str | None = Field(default_factory=lambda: _env("EVERMEM_SCENE", "assistant"))
 
+    memory_chunk_tokens: int = Field(default_factory=lambda: int(_env("MEMORY_CHUNK_TOKENS", "400")))
+    memory_fingerprint_path: str | None = Field(
+        default_factory=lambda: _env("MEMORY_FINGERPRINT_PATH", ".bee/memory_fingerprints.json")
+    )
+    memory_dedup_distance: int = Field(default_factory=lambda: int(_env("MEMORY_DEDUP_DISTANCE", "3")))
+    memory_bulk_batch_size: int = Field(default_factory=lambda: int(_env("MEMORY_BULK_BATCH_SIZE", "100")))
+    memory_bulk_concurrency: int = Field(default_factory=lambda: int(_env("MEMORY_BULK_CONCURRENCY", "8")))
+
     brave_search_api_key: str | None = Field(default_factory=lambda: _env("BRAVE_SEARCH_API_KEY"))
     brave_search_endpoint: str = Field(
         default_factory=lambda: _env("BRAVE_SEARCH_ENDPOINT", "https://api.search.brave.com/res/v1/web/search")
@@ -34,9 +99,49 @@ class Settings(BaseModel):
 
     browser_use_api_key: str | None = Field(default_factory=lambda: _env("BROWSER_USE_API_KEY"))
     browser_use_llm: str | None = Field(default_factory=lambda: _env("BROWSER_USE_LLM"))
+    browser_use_concurrency: int = Field(default_factory=lambda: int(_env("BROWSER_USE_CONCURRENCY", "4")))
+    browser_use_cache_ttl_sec: float = Field(default_factory=lambda: float(_env("BROWSER_USE_CACHE_TTL_SEC", "900")))
+    browser_use_reuse_sessions: bool = Field(default_factory=lambda: _env("BROWSER_USE_REUSE_SESSIONS", "1") == "1")
+
+    extract_routes_path: str | None = Field(default_factory=lambda: _env("EXTRACT_ROUTES_PATH", ".bee/extract_routes.json"))
+    extract_min_chars: int = Field(default_factory=lambda: int(_env("EXTRACT_MIN_CHARS", "400")))
+    extract_min_quality: float = Field(default_factory=lambda: float(_env("EXTRACT_MIN_QUALITY", "0.6")))
 
     ollama_endpoint: str = Field(default_factory=lambda: _env("OLLAMA_ENDPOINT", "http://localhost:11434"))
+    ollama_endpoints: list[str] = Field(
+        default_factory=lambda: [
+            item.strip()
+            for item in (_env("OLLAMA_ENDPOINTS") or _env("OLLAMA_ENDPOINT", "http://localhost:11434") or "").split(",")
+            if item.strip()
+        ]
+    )
     ollama_model: str = Field(default_factory=lambda: _env("OLLAMA_MODEL", "llama3.1:8b"))
+    ollama_node_concurrency: int = Field(default_factory=lambda: int(_env("OLLAMA_NODE_CONCURRENCY", "2")))
+    ollama_retries: int = Field(default_factory=lambda: int(_env("OLLAMA_RETRIES", "2")))
+    ollama_prewarm_models: list[str] = Field(
+        default_factory=lambda: [item.strip() for item in (_env("OLLAMA_PREWARM_MODELS") or "").split(",") if item.strip()]
+    )
+    ollama_keep_alive_min_sec: int = Field(default_factory=lambda: int(_env("OLLAMA_KEEP_ALIVE_MIN_SEC", "60")))
+    ollama_keep_alive_max_sec: int = Field(default_factory=lambda: int(_env("OLLAMA_KEEP_ALIVE_MAX_SEC", "1800")))
+    ollama_hot_threshold: int = Field(default_factory=lambda: int(_env("OLLAMA_HOT_THRESHOLD", "3")))
+
+    swarm_cache_dir: str | None = Field(default_factory=lambda: _env("SWARM_CACHE_DIR", ".bee/swarm_cache"))
+    swarm_cache_max_mb: int = Field(default_factory=lambda: int(_env("SWARM_CACHE_MAX_MB", "64")))
+    swarm_cache_ttl_sec: float = Field(default_factory=lambda: float(_env("SWARM_CACHE_TTL_SEC", "86400")))
+    swarm_semantic_model: str | None = Field(default_factory=lambda: _env("SWARM_SEMANTIC_MODEL"))
+    swarm_semantic_threshold: float = Field(default_factory=lambda: float(_env("SWARM_SEMANTIC_THRESHOLD", "0.95")))
+    swarm_semantic_scan_limit: int = Field(default_factory=lambda: int(_env("SWARM_SEMANTIC_SCAN_LIMIT", "1000")))
+    swarm_semantic_index_path: str | None = Field(
+        default_factory=lambda: _env("SWARM_SEMANTIC_INDEX_PATH", ".bee/swarm_semantic.json")
+    )
+    swarm_map_reduce_url_concurrency: int = Field(
+        default_factory=lambda: int(_env("SWARM_MAP_REDUCE_URL_CONCURRENCY", "4"))
+    )
+
+    jobs_path: str | None = Field(default_factory=lambda: _env("JOBS_PATH", ".bee/jobs.json"))
+    jobs_youtube_workers: int = Field(default_factory=lambda: int(_env("JOBS_YOUTUBE_WORKERS", "2")))
+    jobs_browser_use_workers: int = Field(default_factory=lambda: int(_env("JOBS_BROWSER_USE_WORKERS", "2")))
+    jobs_max_wait_sec: float = Field(default_factory=lambda: float(_env("JOBS_MAX_WAIT_SEC", "60")))
 
     heartbeat_interval_sec: int = Field(default_factory=lambda: int(_env("HEARTBEAT_INTERVAL_SEC", "30")))
     risk_tolerance: int = Field(default_factory=lambda: int(_env("RISK_TOLERANCE", "5")))
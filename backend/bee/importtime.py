@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import builtins
+import sys
+import time
+from typing import Any
+
+
+class ImportProfiler:
+    # Times first-time imports by wrapping builtins.__import__, like a built-in `python -X importtime`.
+    # `ms` includes nested imports and `self_ms` excludes them.
+    def __init__(self) -> None:
+        self.modules: dict[str, dict[str, Any]] = {}
+        self.total_ms = 0.0
+        self._original = builtins.__import__
+        self._began = 0.0
+        # Time spent in nested imports, one accumulator per import in progress.
+        self._children: list[float] = []
+
+    def start(self) -> ImportProfiler:
+        self._original = builtins.__import__
+        self._began = time.perf_counter()
+        builtins.__import__ = self._import
+        return self
+
+    def stop(self) -> ImportProfiler:
+        if builtins.__import__ == self._import:
+            builtins.__import__ = self._original
+        self.total_ms = (time.perf_counter() - self._began) * 1000
+        return self
+
+    def _import(self, name: str, globals: Any = None, locals: Any = None, fromlist: Any = (), level: int = 0) -> Any:
+        if level or name in sys.modules:
+            return self._original(name, globals, locals, fromlist, level)
+        self._children.append(0.0)
+        began = time.perf_counter()
+        try:
+            return self._original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - began
+            children = self._children.pop()
+            if self._children:
+                self._children[-1] += elapsed
+            if name in sys.modules:
+                self.modules[name] = {
+                    "module": name,
+                    "imported_by": (globals or {}).get("__name__"),
+                    "ms": round(elapsed * 1000, 1),
+                    "self_ms": round((elapsed - children) * 1000, 1),
+                }
+
+    def report(self, top: int = 15) -> dict[str, Any]:
+        # The imports our own code asked for are the ones worth acting on; their dependencies are in `ms`.
+        own = [
+            entry
+            for entry in self.modules.values()
+            if entry["imported_by"] in ("__main__", "main") or str(entry["imported_by"]).startswith("bee")
+        ]
+        own.sort(key=lambda entry: entry["ms"], reverse=True)
+        return {"total_ms": round(self.total_ms, 1), "modules": own[:top]}
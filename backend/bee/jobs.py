@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime, timezone
+from typing import Any
+
+from bee.cache import DiskCache
+
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[dict[str, Any]], Awaitable[dict[str, Any]]]
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+@dataclass
+class Job:
+    id: str
+    tool: str
+    payload: dict[str, Any]
+    key: str
+    status: str = QUEUED
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    created_at: str = field(default_factory=_now)
+    started_at: str | None = None
+    finished_at: str | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data.pop("key")
+        return data
+
+
+class JobQueue:
+    def __init__(self, path: str | None = None, *, max_history: int = 500) -> None:
+        self.path = path
+        self.max_history = max_history
+        # Results live in one file per job, written once when it finishes, so saving the job list
+        # never re-serializes them.
+        self.results_dir = f"{path}.results" if path else None
+        self._jobs: dict[str, Job] = {}
+        self._inflight: dict[str, str] = {}
+        self._events: dict[str, asyncio.Event] = {}
+        self._running: dict[str, asyncio.Task] = {}
+        self._handlers: dict[str, tuple[JobHandler, int]] = {}
+        self._queues: dict[str, asyncio.Queue[str]] = {}
+        self._workers: list[asyncio.Task] = []
+        self._save_lock = asyncio.Lock()
+        self._load()
+
+    def register(self, tool: str, handler: JobHandler, *, concurrency: int = 2) -> None:
+        self._handlers[tool] = (handler, max(concurrency, 1))
+
+    @property
+    def tools(self) -> list[str]:
+        return list(self._handlers)
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            logger.warning("Job store unreadable path=%s", self.path, exc_info=True)
+            return
+        for item in data.get("jobs", []):
+            job = Job(**item)
+            if job.result is not None:
+                # Written by a version that kept results in the job list.
+                try:
+                    self._write_result(job.id, job.result)
+                except OSError:
+                    logger.warning("Job result save failed id=%s", job.id, exc_info=True)
+            elif job.finished:
+                job.result = self._read_result(job.id)
+            if job.status == RUNNING:
+                # Interrupted by a restart; run it again from the start.
+                job.status = QUEUED
+                job.started_at = None
+            self._jobs[job.id] = job
+            if not job.finished:
+                self._inflight[job.key] = job.id
+
+    def _result_path(self, job_id: str) -> str:
+        return os.path.join(self.results_dir or "", f"{job_id}.json")
+
+    def _read_result(self, job_id: str) -> dict[str, Any] | None:
+        try:
+            with open(self._result_path(job_id), "r", encoding="utf-8") as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logger.warning("Job result unreadable id=%s", job_id, exc_info=True)
+            return None
+
+    def _write_result(self, job_id: str, result: dict[str, Any]) -> None:
+        os.makedirs(self.results_dir, exist_ok=True)
+        path = self._result_path(job_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(result, handle, default=str)
+        os.replace(tmp_path, path)
+
+    def _snapshot(self) -> tuple[dict[str, Any], list[str]]:
+        # Queued and running jobs are always kept; finished ones only up to max_history.
+        finished = [job for job in self._jobs.values() if job.finished]
+        pruned: list[str] = []
+        for job in finished[: max(len(finished) - self.max_history, 0)]:
+            self._jobs.pop(job.id, None)
+            self._events.pop(job.id, None)
+            pruned.append(job.id)
+        return {"jobs": [asdict(replace(job, result=None)) for job in self._jobs.values()]}, pruned
+
+    def _write(self, snapshot: dict[str, Any], pruned: list[str], result: tuple[str, dict[str, Any]] | None) -> None:
+        if result is not None:
+            self._write_result(*result)
+        for job_id in pruned:
+            try:
+                os.remove(self._result_path(job_id))
+            except FileNotFoundError:
+                pass
+        directory = os.path.dirname(self.path or "")
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(snapshot, handle, default=str)
+        os.replace(tmp_path, self.path)
+
+    async def _save(self, finished: Job | None = None) -> None:
+        if not self.path:
+            return
+        snapshot, pruned = self._snapshot()
+        result = (finished.id, finished.result) if finished is not None and finished.result is not None else None
+        # Shielded so a worker cancelled at shutdown still writes the result and prunes it just snapshotted.
+        await asyncio.shield(self._write_locked(snapshot, pruned, result))
+
+    async def _write_locked(
+        self, snapshot: dict[str, Any], pruned: list[str], result: tuple[str, dict[str, Any]] | None
+    ) -> None:
+        async with self._save_lock:
+            try:
+                await asyncio.to_thread(self._write, snapshot, pruned, result)
+            except OSError:
+                logger.warning("Job store save failed path=%s", self.path, exc_info=True)
+
+    def _event(self, job_id: str) -> asyncio.Event:
+        return self._events.setdefault(job_id, asyncio.Event())
+
+    async def start(self) -> None:
+        if self._workers:
+            return
+        for tool, (_, concurrency) in self._handlers.items():
+            queue = self._queues.setdefault(tool, asyncio.Queue())
+            for _ in range(concurrency):
+                self._workers.append(asyncio.create_task(self._worker(tool, queue)))
+        for job in self._jobs.values():
+            if job.status == QUEUED and job.tool in self._queues:
+                self._queues[job.tool].put_nowait(job.id)
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+        await self._save()
+
+    async def submit(self, tool: str, payload: dict[str, Any]) -> tuple[Job, bool]:
+        if tool not in self._handlers:
+            raise KeyError(tool)
+        key = DiskCache.make_key(tool, payload)
+        existing_id = self._inflight.get(key)
+        if existing_id and existing_id in self._jobs and not self._jobs[existing_id].finished:
+            return self._jobs[existing_id], False
+
+        job = Job(id=uuid.uuid4().hex, tool=tool, payload=payload, key=key)
+        self._jobs[job.id] = job
+        self._inflight[key] = job.id
+        self._queues.setdefault(tool, asyncio.Queue()).put_nowait(job.id)
+        await self._save()
+        return job, True
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def list_jobs(self, *, tool: str | None = None, status: str | None = None) -> list[Job]:
+        return [
+            job
+            for job in self._jobs.values()
+            if (tool is None or job.tool == tool) and (status is None or job.status == status)
+        ]
+
+    async def wait(self, job_id: str, timeout: float) -> Job | None:
+        job = self._jobs.get(job_id)
+        if job is None or job.finished or timeout <= 0:
+            return job
+        try:
+            await asyncio.wait_for(self._event(job_id).wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self._jobs.get(job_id)
+
+    async def cancel(self, job_id: str) -> Job | None:
+        job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return job
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+            return job
+        await self._finish(job, CANCELLED)
+        return job
+
+    async def _finish(
+        self,
+        job: Job,
+        status: str,
+        *,
+        result: dict[str, Any] | None = None,
+        error: str | None = None,
+    ) -> None:
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = _now()
+        if self._inflight.get(job.key) == job.id:
+            del self._inflight[job.key]
+        self._event(job.id).set()
+        await self._save(job)
+
+    async def _worker(self, tool: str, queue: asyncio.Queue[str]) -> None:
+        handler, _ = self._handlers[tool]
+        while True:
+            job_id = await queue.get()
+            job = self._jobs.get(job_id)
+            if job is None or job.status != QUEUED:
+                continue
+
+            job.status = RUNNING
+            job.started_at = _now()
+            await self._save()
+            task = asyncio.create_task(handler(job.payload))
+            self._running[job_id] = task
+            try:
+                result = await asyncio.shield(task)
+            except asyncio.CancelledError:
+                if not task.cancelled():
+                    # The worker itself is shutting down; leave the job to be resumed.
+                    task.cancel()
+                    raise
+                await self._finish(job, CANCELLED)
+            except Exception as exc:
+                logger.warning("Job failed id=%s tool=%s", job_id, tool, exc_info=True)
+                await self._finish(job, FAILED, error=str(exc))
+            else:
+                if isinstance(result, dict) and result.get("ok") is False:
+                    # Tools report most failures in the result rather than by raising.
+                    error = result.get("error") or "Tool reported failure"
+                    await self._finish(job, FAILED, result=result, error=str(error))
+                else:
+                    await self._finish(job, SUCCEEDED, result=result)
+            finally:
+                self._running.pop(job_id, None)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            tool: {
+                "queued": sum(1 for job in self._jobs.values() if job.tool == tool and job.status == QUEUED),
+                "running": sum(1 for job in self._jobs.values() if job.tool == tool and job.status == RUNNING),
+                "workers": concurrency,
+            }
+            for tool, (_, concurrency) in self._handlers.items()
+        }
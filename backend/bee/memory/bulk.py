@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from collections.abc import AsyncIterator
+from typing import Any
+
+import httpx
+from pydantic import TypeAdapter, ValidationError
+
+from bee.memory.evermemos import EvermemOS
+from bee.models import EvermemAddRequest
+
+
+logger = logging.getLogger(__name__)
+
+MAX_LINE_BYTES = 1 << 20
+
+_BATCH = TypeAdapter(list[EvermemAddRequest])
+
+# (line number, validated item or None, error or None)
+_Row = tuple[int, EvermemAddRequest | None, str | None]
+
+
+async def _lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[tuple[int, bytes | None]]:
+    # Only the current partial line is buffered; an oversized line is dropped and reported as None.
+    buffer = bytearray()
+    oversized = False
+    number = 0
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if not oversized:
+                buffer += chunk[start:] if end < 0 else chunk[start:end]
+                if len(buffer) > max_line_bytes:
+                    oversized = True
+                    buffer.clear()
+            if end < 0:
+                break
+            number += 1
+            yield number, None if oversized else bytes(buffer)
+            buffer.clear()
+            oversized = False
+            start = end + 1
+    if buffer.strip() or oversized:
+        yield number + 1, None if oversized else bytes(buffer)
+
+
+def _validate(batch: list[tuple[int, bytes | None]]) -> list[_Row]:
+    raw = [line for _, line in batch if line is not None]
+    if len(raw) == len(batch):
+        # One parse for the whole batch; a count mismatch means some line was not a single object.
+        try:
+            items = _BATCH.validate_json(b"[" + b",".join(raw) + b"]")
+        except ValidationError:
+            items = None
+        if items is not None and len(items) == len(batch):
+            return [(number, item, None) for (number, _), item in zip(batch, items)]
+
+    rows: list[_Row] = []
+    for number, line in batch:
+        if line is None:
+            rows.append((number, None, "line too long"))
+            continue
+        try:
+            rows.append((number, EvermemAddRequest.model_validate_json(line), None))
+        except ValidationError as exc:
+            error = exc.errors()[0]
+            location = ".".join(str(part) for part in error.get("loc", ()))
+            rows.append((number, None, f"{location}: {error['msg']}" if location else error["msg"]))
+    return rows
+
+
+async def ingest_ndjson(
+    chunks: AsyncIterator[bytes],
+    evermem: EvermemOS,
+    *,
+    batch_size: int = 100,
+    concurrency: int = 8,
+    max_line_bytes: int = MAX_LINE_BYTES,
+) -> AsyncIterator[dict[str, Any]]:
+    batch_size = max(batch_size, 1)
+    concurrency = max(concurrency, 1)
+    # Parsing runs at most two batches ahead of the writes, so memory stays flat however large the upload.
+    batches: asyncio.Queue[list[_Row] | None] = asyncio.Queue(maxsize=2)
+    read_error: list[BaseException] = []
+
+    async def produce() -> None:
+        batch: list[tuple[int, bytes | None]] = []
+        try:
+            async for number, line in _lines(chunks, max_line_bytes):
+                if line is not None and not line.strip():
+                    continue
+                batch.append((number, line))
+                if len(batch) >= batch_size:
+                    await batches.put(_validate(batch))
+                    batch = []
+            if batch:
+                await batches.put(_validate(batch))
+        except Exception as exc:
+            read_error.append(exc)
+        await batches.put(None)
+
+    counts = {"lines": 0, "stored": 0, "failed": 0, "invalid": 0}
+    limit = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(timeout=20, limits=httpx.Limits(max_connections=concurrency)) as client:
+
+        async def forward(row: _Row) -> dict[str, Any]:
+            number, item, error = row
+            if item is None:
+                return {"type": "line", "line": number, "ok": False, "error": error}
+            message_id = item.message_id or str(uuid.uuid4())
+            async with limit:
+                result = await evermem.add_memory(
+                    content=item.content,
+                    message_id=message_id,
+                    create_time=item.create_time,
+                    sender=item.sender,
+                    sender_name=item.sender_name,
+                    role=item.role,
+                    group_id=item.group_id,
+                    group_name=item.group_name,
+                    refer_list=item.refer_list,
+                    client=client,
+                )
+            if result is None:
+                return {"type": "line", "line": number, "ok": False, "message_id": message_id, "error": "memory write failed"}
+            return {"type": "line", "line": number, "ok": True, "message_id": message_id}
+
+        producer = asyncio.create_task(produce())
+        try:
+            while (rows := await batches.get()) is not None:
+                for event in await asyncio.gather(*(forward(row) for row in rows)):
+                    counts["lines"] += 1
+                    if event["ok"]:
+                        counts["stored"] += 1
+                    elif "message_id" in event:
+                        counts["failed"] += 1
+                    else:
+                        counts["invalid"] += 1
+                    yield event
+        finally:
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+
+    done: dict[str, Any] = {"type": "done", "ok": not read_error and counts["failed"] == 0, **counts}
+    if read_error:
+        logger.warning("Bulk memory upload aborted after %s lines: %s", counts["lines"], read_error[0])
+        done["error"] = f"upload aborted: {read_error[0]}"
+    yield done
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import uuid
+from typing import Any
+
+from bee.memory.evermemos import EvermemOS
+
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n{2,}")
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+SIMHASH_BITS = 64
+_BANDS = 4
+_BAND_BITS = SIMHASH_BITS // _BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+# Most memory ids a stored chunk refers back to.
+_MAX_REFERS = 16
+
+
+def chunk_text(text: str, max_tokens: int = 400) -> list[str]:
+    chunks: list[str] = []
+    current: list[str] = []
+    size = 0
+    for sentence in _SENTENCE_SPLIT.split(text):
+        words = sentence.split()
+        while len(words) > max_tokens:
+            if current:
+                chunks.append(" ".join(current))
+                current, size = [], 0
+            chunks.append(" ".join(words[:max_tokens]))
+            words = words[max_tokens:]
+        if not words:
+            continue
+        if size + len(words) > max_tokens and current:
+            chunks.append(" ".join(current))
+            current, size = [], 0
+        current.extend(words)
+        size += len(words)
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def simhash(text: str, shingle: int = 3) -> int:
+    tokens = [token.lower() for token in _WORD.findall(text)]
+    if len(tokens) >= shingle:
+        features = [" ".join(tokens[idx : idx + shingle]) for idx in range(len(tokens) - shingle + 1)]
+    else:
+        features = [" ".join(tokens)]
+    weights = [0] * SIMHASH_BITS
+    for feature in features:
+        digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if digest >> bit & 1 else -1
+    value = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            value |= 1 << bit
+    return value
+
+
+# Lookups use 4 x 16-bit bands: any fingerprint within Hamming distance 3 of a stored
+# one is guaranteed to share at least one band with it, so larger distances are clamped.
+class FingerprintIndex:
+    def __init__(self, path: str | None, max_distance: int = 3, max_entries: int = 50000) -> None:
+        self.path = path
+        self.max_distance = min(max(max_distance, 0), _BANDS - 1)
+        if self.max_distance != max_distance:
+            logger.warning("Fingerprint distance %s out of range; using %s", max_distance, self.max_distance)
+        self.max_entries = max_entries
+        self._entries: dict[int, str] = {}
+        self._bands: list[dict[int, set[int]]] = [{} for _ in range(_BANDS)]
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _band_keys(fingerprint: int) -> list[int]:
+        return [fingerprint >> (idx * _BAND_BITS) & _BAND_MASK for idx in range(_BANDS)]
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            logger.warning("Fingerprint index unreadable path=%s", self.path, exc_info=True)
+            return
+        for fingerprint, message_id in data.get("entries", []):
+            self._insert(int(fingerprint, 16), message_id)
+
+    def _insert(self, fingerprint: int, message_id: str) -> None:
+        self._entries[fingerprint] = message_id
+        for band, key in zip(self._bands, self._band_keys(fingerprint)):
+            band.setdefault(key, set()).add(fingerprint)
+
+    def _remove(self, fingerprint: int) -> None:
+        self._entries.pop(fingerprint, None)
+        for band, key in zip(self._bands, self._band_keys(fingerprint)):
+            bucket = band.get(key)
+            if bucket is not None:
+                bucket.discard(fingerprint)
+                if not bucket:
+                    del band[key]
+
+    def lookup(self, fingerprint: int) -> str | None:
+        if fingerprint in self._entries:
+            return self._entries[fingerprint]
+        best: tuple[int, str] | None = None
+        for band, key in zip(self._bands, self._band_keys(fingerprint)):
+            for candidate in band.get(key, ()):
+                distance = (candidate ^ fingerprint).bit_count()
+                if distance <= self.max_distance and (best is None or distance < best[0]):
+                    best = (distance, self._entries[candidate])
+        return best[1] if best else None
+
+    def add(self, fingerprint: int, message_id: str) -> None:
+        self._entries.pop(fingerprint, None)
+        self._insert(fingerprint, message_id)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def discard(self, fingerprint: int, message_id: str) -> None:
+        if self._entries.get(fingerprint) == message_id:
+            self._remove(fingerprint)
+
+    def snapshot(self) -> list[list[str]]:
+        return [[f"{fingerprint:016x}", message_id] for fingerprint, message_id in self._entries.items()]
+
+    def save(self, entries: list[list[str]] | None = None) -> None:
+        if not self.path:
+            return
+        if entries is None:
+            entries = self.snapshot()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump({"entries": entries}, handle)
+        os.replace(tmp_path, self.path)
+
+
+class ChunkedMemoryWriter:
+    def __init__(self, evermem: EvermemOS, index: FingerprintIndex, max_tokens: int = 400) -> None:
+        self.evermem = evermem
+        self.index = index
+        self.max_tokens = max_tokens
+        self._lock = asyncio.Lock()
+        self._save_lock = asyncio.Lock()
+
+    async def store(self, header: str, text: str) -> dict[str, Any]:
+        chunks = chunk_text(text, self.max_tokens) or [""]
+        total = len(chunks)
+        stored: list[str] = []
+        referenced: list[str] = []
+
+        # The lock covers only the index: fresh fingerprints are reserved under it so a concurrent store of
+        # the same text sees them as duplicates, and the memory writes happen after it is released.
+        async with self._lock:
+            fresh: list[tuple[int, int, str, str]] = []
+            seen: set[int] = set()
+            for idx, chunk in enumerate(chunks):
+                fingerprint = simhash(chunk)
+                existing = self.index.lookup(fingerprint)
+                if existing is not None:
+                    if existing not in referenced:
+                        referenced.append(existing)
+                    continue
+                if fingerprint in seen:
+                    continue
+                seen.add(fingerprint)
+                message_id = str(uuid.uuid4())
+                self.index.add(fingerprint, message_id)
+                fresh.append((idx, fingerprint, chunk, message_id))
+
+        failed: list[tuple[int, str]] = []
+        for idx, fingerprint, chunk, message_id in fresh:
+            part = f"{header} (part {idx + 1}/{total})" if total > 1 else header
+            # Each part refers to the document's first duplicates and to the part before it, so the
+            # list stays bounded however long the document is.
+            refer_list = referenced[:_MAX_REFERS] + stored[-1:]
+            result = await self.evermem.add_memory(
+                content=f"{part}\n\n{chunk}".rstrip(),
+                message_id=message_id,
+                refer_list=refer_list or None,
+            )
+            if result is None:
+                failed.append((fingerprint, message_id))
+                continue
+            stored.append(message_id)
+
+        async with self._lock:
+            for fingerprint, message_id in failed:
+                self.index.discard(fingerprint, message_id)
+            entries = self.index.snapshot() if stored else None
+
+        if entries is not None:
+            async with self._save_lock:
+                try:
+                    await asyncio.to_thread(self.index.save, entries)
+                except OSError:
+                    logger.warning("Fingerprint index save failed path=%s", self.index.path, exc_info=True)
+
+        return {
+            "chunks": total,
+            "stored": stored,
+            "duplicates": total - len(fresh),
+            "referenced": referenced,
+        }
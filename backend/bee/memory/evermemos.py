@@ -147,6 +147,7 @@ class EvermemOS:
         group_id: str | None = None,
         group_name: str | None = None,
         refer_list: list[str] | None = None,
+        client: httpx.AsyncClient | None = None,
     ) -> dict[str, Any] | None:
         if not self.endpoint:
             return None
@@ -168,12 +169,15 @@ class EvermemOS:
             payload["refer_list"] = refer_list
 
         try:
-            async with httpx.AsyncClient(timeout=20) as client:
-                resp = await client.post(
-                    self._url("/api/v1/memories"),
-                    json=payload,
-                    headers=self._headers(),
-                )
+            if client is not None:
+                resp = await client.post(self._url("/api/v1/memories"), json=payload, headers=self._headers())
+            else:
+                async with httpx.AsyncClient(timeout=20) as own_client:
+                    resp = await own_client.post(
+                        self._url("/api/v1/memories"),
+                        json=payload,
+                        headers=self._headers(),
+                    )
         except httpx.HTTPError:
             logger.warning("EvermemOS add_memory failed", exc_info=True)
             return None
@@ -528,27 +532,21 @@ class EvermemOS:
         content = self._format_goals(goals)
         await self.add_memory(content=content)
 
-    async def fetch_goals(self) -> list[str]:
-        if not self.endpoint:
-            return []
-
-        response = await self.search_memories("BEE Goals:", top_k=5)
-        if not response:
-            return []
-
+    @staticmethod
+    def _memory_contents(response: dict[str, Any] | None) -> list[tuple[str, str]]:
         result = response.get("result", {}) if isinstance(response, dict) else {}
         memories = result.get("memories", []) if isinstance(result, dict) else []
         pending = result.get("pending_messages", []) if isinstance(result, dict) else []
 
-        candidates: list[tuple[str, str]] = []
+        contents: list[tuple[str, str]] = []
         if isinstance(pending, list):
             for item in pending:
                 if not isinstance(item, dict):
                     continue
                 content = item.get("content")
-                if isinstance(content, str) and "BEE Goals:" in content:
+                if isinstance(content, str):
                     stamp = item.get("message_create_time") or ""
-                    candidates.append((stamp, content))
+                    contents.append((stamp, content))
 
         if isinstance(memories, list):
             for group in memories:
@@ -563,11 +561,37 @@ class EvermemOS:
                         content = memory.get("content") or memory.get("summary")
                         if not isinstance(content, str):
                             continue
-                        if "BEE Goals:" not in content:
-                            continue
                         stamp = memory.get("timestamp") or ""
-                        candidates.append((stamp, content))
+                        contents.append((stamp, content))
+
+        return contents
+
+    async def search_contents(self, query: str, top_k: int = 20) -> list[str]:
+        if not self.endpoint:
+            return []
+        response = await self.search_memories(query, top_k=top_k)
+        seen: set[str] = set()
+        contents: list[str] = []
+        for _, content in self._memory_contents(response):
+            if content not in seen:
+                seen.add(content)
+                contents.append(content)
+        return contents
+
+    async def fetch_goals(self) -> list[str] | None:
+        # None when the search itself failed, [] when no goals are stored.
+        if not self.endpoint:
+            return []
+
+        response = await self.search_memories("BEE Goals:", top_k=5)
+        if response is None:
+            return None
+        if not response:
+            return []
 
+        candidates = [
+            (stamp, content) for stamp, content in self._memory_contents(response) if "BEE Goals:" in content
+        ]
         for _, content in sorted(candidates, key=lambda item: item[0], reverse=True):
             goals = self._parse_goals(content)
             if goals:
@@ -0,0 +1,10 @@
+from __future__ import annotations
+
+
+def percentile(samples: list[float], pct: float) -> float | None:
+    # Nearest-rank on the sorted samples, rounded for reports; None when nothing was measured.
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return round(ordered[index], 1)
@@ -81,6 +81,18 @@ class WebSearchRequest(BaseModel):
 class WebScrapeRequest(BaseModel):
     url: str
     max_chars: Optional[int] = 20000
+    extract: Optional[bool] = False
+
+
+class WebResearchRequest(BaseModel):
+    query: str
+    count: Optional[int] = 5
+    scrape_top: Optional[int] = 3
+    max_chars: Optional[int] = 20000
+    country: Optional[str] = "US"
+    search_lang: Optional[str] = "en"
+    store_memory: Optional[bool] = False
+    deadline_sec: Optional[float] = 20.0
 
 
 class YouTubeTranscribeRequest(BaseModel):
@@ -91,3 +103,45 @@ class YouTubeTranscribeRequest(BaseModel):
 class BrowserUseExtractRequest(BaseModel):
     url: str
     store_memory: Optional[bool] = True
+    force_browser: Optional[bool] = False
+
+
+class BrowserUseExtractManyRequest(BaseModel):
+    urls: List[str]
+
+
+class SwarmGenerateRequest(BaseModel):
+    prompt: str
+    model: Optional[str] = None
+    options: Optional[Dict[str, Any]] = None
+    priority: Optional[int] = 10
+    # None: cache only deterministic sampling (temperature 0 or a fixed seed); True/False forces it.
+    cache: Optional[bool] = None
+
+
+class SwarmMapReduceRequest(BaseModel):
+    map_prompt: str
+    reduce_prompt: str
+    texts: Optional[List[str]] = None
+    urls: Optional[List[str]] = Field(default=None, max_length=50)
+    memory_query: Optional[str] = None
+    memory_top_k: Optional[int] = 20
+    model: Optional[str] = None
+    options: Optional[Dict[str, Any]] = None
+    concurrency: Optional[int] = None
+    chunk_tokens: Optional[int] = 1500
+    fan_in: Optional[int] = 4
+    max_reduce_chars: Optional[int] = 12000
+
+
+class SwarmPrewarmRequest(BaseModel):
+    models: Optional[List[str]] = None
+
+
+class VoiceSynthesizeRequest(BaseModel):
+    text: str
+
+
+class JobSubmitRequest(BaseModel):
+    tool: str
+    payload: Dict[str, Any] = Field(default_factory=dict)
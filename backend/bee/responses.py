@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import decimal
+import functools
+import inspect
+from collections.abc import Callable, Coroutine
+from pathlib import PurePath
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse, Response
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from starlette.requests import Request
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    if isinstance(value, PurePath):
+        return str(value)
+    if isinstance(value, decimal.Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    if isinstance(content, BaseModel):
+        # Serialized by pydantic-core straight to bytes, without an intermediate dict.
+        return content.__pydantic_serializer__.to_json(content)
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class FastRoute(APIRoute):
+    # FastAPI validates every return value against the response model and walks it through
+    # jsonable_encoder before rendering. For routes returning a plain dict, or exactly their declared
+    # pydantic model, that pass changes nothing, so the value goes to FastJSONResponse as-is.
+    def _fast_model(self) -> type[BaseModel] | None | bool:
+        if self.dependant.response_param_name or not inspect.iscoroutinefunction(self.dependant.call):
+            return False
+        if (
+            self.response_model_include is not None
+            or self.response_model_exclude is not None
+            or not self.response_model_by_alias
+            or self.response_model_exclude_unset
+            or self.response_model_exclude_defaults
+            or self.response_model_exclude_none
+        ):
+            return False
+        if self.response_model is None or self.response_model is dict:
+            return None
+        if isinstance(self.response_model, type) and issubclass(self.response_model, BaseModel):
+            return self.response_model
+        return False
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        model = self._fast_model()
+        if model is not False:
+            call = self.dependant.call
+            status_code = self.status_code or 200
+
+            @functools.wraps(call)
+            async def endpoint(*args: Any, **kwargs: Any) -> Any:
+                result = await call(*args, **kwargs)
+                if (isinstance(result, dict) and model is None) or (model is not None and type(result) is model):
+                    return FastJSONResponse(result, status_code=status_code)
+                return result
+
+            self.dependant.call = endpoint
+        return super().get_route_handler()
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import itertools
+import math
+import operator
+import os
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from bee.cache import DiskCache
+
+
+logger = logging.getLogger(__name__)
+
+Embedder = Callable[[str], Awaitable[list[float] | None]]
+
+# Fields that describe where/when a result was produced rather than the result itself.
+_VOLATILE_FIELDS = ("node", "queue_wait_ms", "created_at", "context")
+_SAVE_EVERY = 25
+
+
+def is_deterministic(options: dict[str, Any] | None) -> bool:
+    # Ollama samples at temperature 0.8 by default; only greedy decoding or a fixed seed is repeatable.
+    if not options:
+        return False
+    if options.get("seed") is not None:
+        return True
+    try:
+        return float(options.get("temperature", 0.8)) == 0.0
+    except (TypeError, ValueError):
+        return False
+
+
+def _normalize(vector: list[float]) -> list[float] | None:
+    norm = math.sqrt(sum(value * value for value in vector))
+    if not norm:
+        return None
+    return [value / norm for value in vector]
+
+
+class GenerationCache:
+    def __init__(
+        self,
+        disk: DiskCache,
+        *,
+        embed: Embedder | None = None,
+        semantic_threshold: float = 0.95,
+        semantic_path: str | None = None,
+        semantic_max_entries: int = 5000,
+        semantic_scan_limit: int = 1000,
+    ) -> None:
+        self.disk = disk
+        self.embed = embed
+        self.semantic_threshold = semantic_threshold
+        self.semantic_path = semantic_path
+        self.semantic_max_entries = semantic_max_entries
+        self.semantic_scan_limit = max(semantic_scan_limit, 1)
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        # exact key -> (model, options key, unit vector); ordered least recently used first.
+        self._vectors: OrderedDict[str, tuple[str, str, list[float]]] = OrderedDict()
+        # (model, options key) -> exact key -> unit vector, in the same recency order; only one bucket can match.
+        self._buckets: dict[tuple[str, str], OrderedDict[str, list[float]]] = {}
+        self._dirty = 0
+        self._load()
+
+    @property
+    def semantic(self) -> bool:
+        return self.embed is not None
+
+    @staticmethod
+    def _options_key(options: dict[str, Any] | None) -> str:
+        return json.dumps(options or {}, sort_keys=True, default=str)
+
+    def key(self, model: str, prompt: str, options: dict[str, Any] | None) -> str:
+        return DiskCache.make_key("swarm", model, prompt, self._options_key(options))
+
+    def should_use(self, options: dict[str, Any] | None, force: bool | None = None) -> bool:
+        if force is not None:
+            use = force
+        else:
+            use = is_deterministic(options)
+        if not use:
+            self.bypassed += 1
+        return use
+
+    def _load(self) -> None:
+        if not self.semantic_path or not os.path.exists(self.semantic_path):
+            return
+        try:
+            with open(self.semantic_path, "r", encoding="utf-8") as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            logger.warning("Semantic cache index unreadable path=%s", self.semantic_path, exc_info=True)
+            return
+        for key, model, options_key, vector in data.get("entries", []):
+            self._remember(key, model, options_key, vector)
+
+    def _remember(self, key: str, model: str, options_key: str, vector: list[float]) -> None:
+        self._forget(key)
+        self._vectors[key] = (model, options_key, vector)
+        self._buckets.setdefault((model, options_key), OrderedDict())[key] = vector
+
+    def _forget(self, key: str) -> None:
+        entry = self._vectors.pop(key, None)
+        if entry is None:
+            return
+        bucket = self._buckets.get(entry[:2])
+        if bucket is not None:
+            bucket.pop(key, None)
+            if not bucket:
+                del self._buckets[entry[:2]]
+
+    def _touch(self, key: str) -> None:
+        entry = self._vectors.get(key)
+        if entry is None:
+            return
+        self._vectors.move_to_end(key)
+        self._buckets[entry[:2]].move_to_end(key)
+
+    def _write(self, entries: list[list[Any]]) -> None:
+        directory = os.path.dirname(self.semantic_path or "")
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.semantic_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump({"entries": entries}, handle)
+        os.replace(tmp_path, self.semantic_path)
+
+    async def save(self) -> None:
+        if not self.semantic_path or not self._dirty:
+            return
+        self._dirty = 0
+        entries = [[key, model, options_key, vector] for key, (model, options_key, vector) in self._vectors.items()]
+        try:
+            await asyncio.to_thread(self._write, entries)
+        except OSError:
+            logger.warning("Semantic cache index save failed path=%s", self.semantic_path, exc_info=True)
+
+    async def _embed(self, prompt: str) -> list[float] | None:
+        if self.embed is None:
+            return None
+        try:
+            vector = await self.embed(prompt)
+        except Exception:
+            logger.warning("Prompt embedding failed; skipping semantic cache", exc_info=True)
+            return None
+        return _normalize(vector) if vector else None
+
+    def _scan(self, vector: list[float], candidates: list[tuple[str, list[float]]]) -> str | None:
+        best: tuple[float, str] | None = None
+        for key, entry_vector in candidates:
+            if len(entry_vector) != len(vector):
+                continue
+            similarity = sum(map(operator.mul, vector, entry_vector))
+            if similarity >= self.semantic_threshold and (best is None or similarity > best[0]):
+                best = (similarity, key)
+        return best[1] if best else None
+
+    async def _nearest(self, model: str, options_key: str, vector: list[float]) -> str | None:
+        bucket = self._buckets.get((model, options_key))
+        if not bucket:
+            return None
+        # The most recently used entries are the likeliest repeats; the scan is bounded and runs off the
+        # event loop on a snapshot, so streaming responses are not stalled by it.
+        candidates = list(itertools.islice(reversed(bucket.items()), self.semantic_scan_limit))
+        return await asyncio.to_thread(self._scan, vector, candidates)
+
+    async def get(
+        self, model: str, prompt: str, options: dict[str, Any] | None
+    ) -> tuple[dict[str, Any] | None, str | None, list[float] | None]:
+        key = self.key(model, prompt, options)
+        result = await asyncio.to_thread(self.disk.get_json, key)
+        if result is not None:
+            self.exact_hits += 1
+            self._touch(key)
+            return result, "exact", None
+        vector = await self._embed(prompt)
+        if vector is not None:
+            match = await self._nearest(model, self._options_key(options), vector)
+            if match is not None:
+                result = await asyncio.to_thread(self.disk.get_json, match)
+                if result is not None:
+                    self.semantic_hits += 1
+                    self._touch(match)
+                    return result, "semantic", vector
+                # The exact tier evicted it (LRU or TTL); forget the vector too.
+                self._forget(match)
+                self._dirty += 1
+        self.misses += 1
+        return None, None, vector
+
+    async def set(
+        self,
+        model: str,
+        prompt: str,
+        options: dict[str, Any] | None,
+        result: dict[str, Any],
+        vector: list[float] | None = None,
+    ) -> None:
+        key = self.key(model, prompt, options)
+        value = {name: item for name, item in result.items() if name not in _VOLATILE_FIELDS}
+        try:
+            await asyncio.to_thread(self.disk.set_json, key, value)
+        except OSError:
+            logger.warning("Generation cache write failed", exc_info=True)
+            return
+        if self.embed is None:
+            return
+        if vector is None:
+            vector = await self._embed(prompt)
+        if vector is None:
+            return
+        self._remember(key, model, self._options_key(options), vector)
+        while len(self._vectors) > self.semantic_max_entries:
+            self._forget(next(iter(self._vectors)))
+        self._dirty += 1
+        # The index holds full vectors, so it is flushed in batches (and on close) rather than per insert.
+        if self._dirty >= _SAVE_EVERY:
+            await self.save()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        return {
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": round((self.exact_hits + self.semantic_hits) / lookups, 3) if lookups else None,
+            "semantic": self.semantic,
+            "semantic_entries": len(self._vectors),
+            "disk": self.disk.stats(),
+        }
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+from typing import Any
+
+from bee.memory.dedup import chunk_text
+from bee.swarm.ollama_swarm import OllamaSwarm, SwarmError
+
+
+logger = logging.getLogger(__name__)
+
+# Batch work queues behind interactive generate calls (priority 10); reductions finish ahead of new maps.
+MAP_PRIORITY = 20
+REDUCE_PRIORITY = 15
+# A failed reduce is retried this many times before its inputs are given up on.
+REDUCE_RETRIES = 2
+
+
+def _take_group(buffer: list[str], fan_in: int, max_chars: int) -> list[str]:
+    group: list[str] = []
+    size = 0
+    for item in buffer:
+        if len(group) >= fan_in or (group and size + len(item) > max_chars):
+            break
+        group.append(item)
+        size += len(item)
+    return group
+
+
+def _group_ready(buffer: list[str], fan_in: int, max_chars: int) -> bool:
+    group = _take_group(buffer, fan_in, max_chars)
+    # Full when it hit fan-in, or when the next item would overflow the reduce context.
+    return len(group) >= fan_in or (1 < len(group) < len(buffer))
+
+
+async def map_reduce(
+    swarm: OllamaSwarm,
+    documents: list[tuple[str, str]],
+    map_prompt: str,
+    reduce_prompt: str,
+    *,
+    model: str | None = None,
+    options: dict[str, Any] | None = None,
+    concurrency: int = 4,
+    chunk_tokens: int = 1500,
+    fan_in: int = 4,
+    max_reduce_chars: int = 12000,
+) -> AsyncIterator[dict[str, Any]]:
+    started = time.perf_counter()
+    fan_in = max(fan_in, 2)
+    shards = [
+        (source, index, chunk)
+        for source, text in documents
+        for index, chunk in enumerate(chunk_text(text, chunk_tokens))
+        if chunk.strip()
+    ]
+    yield {"type": "start", "documents": len(documents), "shards": len(shards)}
+    if not shards:
+        yield {"type": "done", "ok": False, "error": "No document text to map", "output": None}
+        return
+
+    limit = asyncio.Semaphore(max(concurrency, 1))
+
+    async def run(prompt: str, priority: int) -> str:
+        async with limit:
+            result = await swarm.generate(prompt, model=model, options=options, priority=priority)
+        return (result.get("response") or "").strip()
+
+    async def map_shard(shard_id: int, source: str, part: int, chunk: str) -> dict[str, Any]:
+        began = time.perf_counter()
+        try:
+            output = await run(f"{map_prompt}\n\n---\n\n{chunk}", MAP_PRIORITY)
+        except SwarmError as exc:
+            return {"type": "map", "ok": False, "shard": shard_id, "source": source, "part": part, "error": str(exc)}
+        return {
+            "type": "map",
+            "ok": True,
+            "shard": shard_id,
+            "source": source,
+            "part": part,
+            "output": output,
+            "ms": round((time.perf_counter() - began) * 1000, 1),
+        }
+
+    async def reduce_group(level: int, group: list[str]) -> dict[str, Any]:
+        began = time.perf_counter()
+        joined = "\n\n---\n\n".join(item[:max_reduce_chars] for item in group)
+        try:
+            output = await run(f"{reduce_prompt}\n\n---\n\n{joined}", REDUCE_PRIORITY)
+        except SwarmError as exc:
+            return {"type": "reduce", "ok": False, "level": level, "inputs": len(group), "error": str(exc)}
+        return {
+            "type": "reduce",
+            "ok": True,
+            "level": level,
+            "inputs": len(group),
+            "output": output,
+            "ms": round((time.perf_counter() - began) * 1000, 1),
+        }
+
+    # buffers[level] holds finished outputs waiting to be reduced into level + 1; maps produce level 0.
+    buffers: dict[int, list[str]] = {}
+    tasks: set[asyncio.Task] = {
+        asyncio.create_task(map_shard(shard_id, source, part, chunk))
+        for shard_id, (source, part, chunk) in enumerate(shards)
+    }
+    # Reduce task -> (level, group, attempt), so a failed group can be retried with the same inputs.
+    reduces: dict[asyncio.Task, tuple[int, list[str], int]] = {}
+    failures = 0
+    lost = 0
+
+    def launch(level: int, group: list[str] | None = None, attempt: int = 0) -> None:
+        if group is None:
+            buffer = buffers[level]
+            group = _take_group(buffer, fan_in, max_reduce_chars)
+            del buffer[: len(group)]
+        task = asyncio.create_task(reduce_group(level + 1, group))
+        tasks.add(task)
+        reduces[task] = (level, group, attempt)
+
+    try:
+        while True:
+            if tasks:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    tasks.discard(task)
+                    event = task.result()
+                    reduced = reduces.pop(task, None)
+                    if event["ok"]:
+                        level = event.get("level", 0)
+                        buffers.setdefault(level, []).append(event["output"])
+                    else:
+                        failures += 1
+                        if reduced is not None and reduced[2] < REDUCE_RETRIES:
+                            event["retrying"] = True
+                            launch(reduced[0], reduced[1], reduced[2] + 1)
+                        else:
+                            # A lost shard or reduce group leaves part of the corpus out of the output.
+                            lost += 1
+                            logger.warning("Map-reduce dropped %s", "a reduce group" if reduced else "a shard")
+                    yield event
+                # Reduce full groups as soon as they exist, so partial summaries stream while maps still run.
+                for level in sorted(buffers):
+                    while _group_ready(buffers[level], fan_in, max_reduce_chars):
+                        launch(level)
+                if tasks:
+                    continue
+            # Everything in flight is finished: flush leftovers from the lowest level upwards.
+            levels = [level for level in sorted(buffers) if buffers[level]]
+            if not levels:
+                break
+            lowest = levels[0]
+            if len(levels) == 1 and len(buffers[lowest]) == 1:
+                if lowest > 0:
+                    break
+                # A single shard still goes through the reduce prompt so the output has the same shape.
+                launch(lowest)
+                continue
+            while len(buffers[lowest]) > 1:
+                launch(lowest)
+            if buffers[lowest]:
+                buffers.setdefault(lowest + 1, []).insert(0, buffers[lowest].pop())
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    levels = [level for level in sorted(buffers) if buffers[level]]
+    output = buffers[levels[-1]][0] if levels else None
+    yield {
+        "type": "done",
+        "ok": output is not None and not lost,
+        "partial": output is not None and bool(lost),
+        "output": output,
+        "shards": len(shards),
+        "failed": failures,
+        "lost": lost,
+        "levels": levels[-1] if levels else 0,
+        "total_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
@@ -1,17 +1,484 @@
-import httpx
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
 from typing import Any
 
+import httpx
+
+from bee.metrics import percentile
+from bee.swarm.cache import GenerationCache
+from bee.swarm.residency import ModelResidency
+
+logger = logging.getLogger(__name__)
+
+# Assumed throughput for a node that has not completed a request yet.
+_DEFAULT_TOKENS_PER_SEC = 20.0
+_TPS_SMOOTHING = 0.3
+_MAX_COOLDOWN_SEC = 30.0
+
+
+class SwarmError(RuntimeError):
+    pass
+
+
+@dataclass
+class OllamaNode:
+    endpoint: str
+    max_concurrency: int = 2
+    outstanding: int = 0
+    tokens_per_sec: float | None = None
+    completed: int = 0
+    failed: int = 0
+    busy_sec: float = 0.0
+    consecutive_failures: int = 0
+    cooldown_until: float = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.cooldown_until
+
+    def mark_failed(self) -> None:
+        self.failed += 1
+        self.consecutive_failures += 1
+        # A single failure is usually transient; back off only once a node fails repeatedly.
+        if self.consecutive_failures >= 2:
+            self.cooldown_until = time.monotonic() + min(2 ** (self.consecutive_failures - 2), _MAX_COOLDOWN_SEC)
+
+    def mark_ok(self) -> None:
+        self.completed += 1
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+
+    def observe(self, tokens: int, elapsed: float) -> None:
+        if tokens <= 0 or elapsed <= 0:
+            return
+        rate = tokens / elapsed
+        if self.tokens_per_sec is None:
+            self.tokens_per_sec = rate
+        else:
+            self.tokens_per_sec += _TPS_SMOOTHING * (rate - self.tokens_per_sec)
+
+    def load(self, fallback_tps: float) -> float:
+        # Expected seconds of queued work per token of throughput: lower is better.
+        return (self.outstanding + 1) / (self.tokens_per_sec or fallback_tps)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "endpoint": self.endpoint,
+            "outstanding": self.outstanding,
+            "max_concurrency": self.max_concurrency,
+            "utilization": round(self.outstanding / self.max_concurrency, 3),
+            "tokens_per_sec": round(self.tokens_per_sec, 2) if self.tokens_per_sec else None,
+            "completed": self.completed,
+            "failed": self.failed,
+            "busy_sec": round(self.busy_sec, 3),
+            "healthy": self.healthy,
+        }
+
+
+@dataclass(order=True)
+class SwarmJob:
+    priority: int
+    seq: int
+    model: str = field(compare=False)
+    prompt: str = field(compare=False)
+    options: dict[str, Any] | None = field(default=None, compare=False)
+    future: asyncio.Future | None = field(default=None, compare=False)
+    tried: set[str] = field(default_factory=set, compare=False)
+    attempts: int = field(default=0, compare=False)
+    enqueued_at: float = field(default_factory=time.perf_counter, compare=False)
+    # Set for streaming jobs: tokens are pushed here as Ollama emits them, then None once the future resolves.
+    sink: asyncio.Queue[str | None] | None = field(default=None, compare=False)
+    first_token_at: float | None = field(default=None, compare=False)
+    task: asyncio.Task | None = field(default=None, compare=False)
+
 
 class OllamaSwarm:
-    def __init__(self, endpoint: str, model: str) -> None:
-        self.endpoint = endpoint
+    def __init__(
+        self,
+        endpoint: str | list[str],
+        model: str,
+        *,
+        max_concurrency: int = 2,
+        retries: int = 2,
+        timeout: float = 120,
+        residency: ModelResidency | None = None,
+        cache: GenerationCache | None = None,
+    ) -> None:
+        endpoints = [endpoint] if isinstance(endpoint, str) else list(endpoint)
+        if not endpoints:
+            raise ValueError("OllamaSwarm needs at least one endpoint")
+        self.nodes = [OllamaNode(item.rstrip("/"), max_concurrency=max(max_concurrency, 1)) for item in endpoints]
+        self.endpoint = self.nodes[0].endpoint
         self.model = model
+        self.retries = retries
+        self.timeout = timeout
+        self.residency = residency or ModelResidency()
+        self.cache = cache
+        self._queue: asyncio.PriorityQueue[SwarmJob] = asyncio.PriorityQueue()
+        self._seq = itertools.count()
+        self._capacity = asyncio.Event()
+        self._dispatcher: asyncio.Task | None = None
+        self._inflight: set[asyncio.Task] = set()
+        self._client: httpx.AsyncClient | None = None
+        self._ttft_ms: deque[float] = deque(maxlen=500)
+        self._stream_tps: deque[float] = deque(maxlen=500)
+        self.streams_cancelled = 0
 
-    async def generate(self, prompt: str) -> dict[str, Any]:
-        async with httpx.AsyncClient(timeout=60) as client:
-            resp = await client.post(
-                f"{self.endpoint}/api/generate",
-                json={"model": self.model, "prompt": prompt, "stream": False},
-            )
+    @property
+    def capacity(self) -> int:
+        return sum(node.max_concurrency for node in self.nodes)
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            limits = httpx.Limits(max_connections=sum(node.max_concurrency for node in self.nodes) + 4)
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=limits)
+        return self._client
+
+    def _ensure_dispatcher(self) -> None:
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def close(self) -> None:
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+        for task in list(self._inflight):
+            task.cancel()
+        await asyncio.gather(*self._inflight, return_exceptions=True)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self.cache is not None:
+            await self.cache.save()
+
+    async def generate(
+        self,
+        prompt: str,
+        *,
+        model: str | None = None,
+        options: dict[str, Any] | None = None,
+        priority: int = 10,
+        cache: bool | None = None,
+    ) -> dict[str, Any]:
+        model = model or self.model
+        use_cache = self.cache is not None and self.cache.should_use(options, cache)
+        vector = None
+        if use_cache:
+            hit, tier, vector = await self.cache.get(model, prompt, options)
+            if hit is not None:
+                return {**hit, "cached": tier}
+        loop = asyncio.get_running_loop()
+        job = SwarmJob(
+            priority=priority,
+            seq=next(self._seq),
+            model=model,
+            prompt=prompt,
+            options=options,
+            future=loop.create_future(),
+        )
+        self.residency.record_demand(job.model)
+        self._ensure_dispatcher()
+        await self._queue.put(job)
+        result = await job.future
+        if use_cache:
+            await self.cache.set(model, prompt, options, result, vector)
+        return result
+
+    async def generate_stream(
+        self,
+        prompt: str,
+        *,
+        model: str | None = None,
+        options: dict[str, Any] | None = None,
+        priority: int = 10,
+        cache: bool | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        model = model or self.model
+        use_cache = self.cache is not None and self.cache.should_use(options, cache)
+        vector = None
+        if use_cache:
+            hit, tier, vector = await self.cache.get(model, prompt, options)
+            if hit is not None:
+                yield {"type": "token", "text": hit.get("response") or ""}
+                yield {
+                    "type": "done",
+                    "model": hit.get("model", model),
+                    "cached": tier,
+                    "ttft_ms": 0.0,
+                    "tokens": hit.get("eval_count"),
+                    "done_reason": hit.get("done_reason"),
+                }
+                return
+        loop = asyncio.get_running_loop()
+        job = SwarmJob(
+            priority=priority,
+            seq=next(self._seq),
+            model=model,
+            prompt=prompt,
+            options=options,
+            future=loop.create_future(),
+            sink=asyncio.Queue(),
+        )
+        self.residency.record_demand(job.model)
+        self._ensure_dispatcher()
+        await self._queue.put(job)
+        parts: list[str] = []
+        try:
+            while True:
+                token = await job.sink.get()
+                if token is None:
+                    break
+                parts.append(token)
+                yield {"type": "token", "text": token}
+            result = await job.future
+        finally:
+            if not job.future.done():
+                # Consumer went away mid-generation: drop the job and abort the upstream request.
+                self.streams_cancelled += 1
+                job.future.cancel()
+                if job.task is not None:
+                    job.task.cancel()
+        finished = time.perf_counter()
+        ttft_ms = round((job.first_token_at - job.enqueued_at) * 1000, 1) if job.first_token_at else None
+        eval_count = int(result.get("eval_count") or 0)
+        eval_sec = (result.get("eval_duration") or 0) / 1e9
+        if eval_count and eval_sec:
+            tokens_per_sec = eval_count / eval_sec
+        elif job.first_token_at and finished > job.first_token_at:
+            tokens_per_sec = len(parts) / (finished - job.first_token_at)
+        else:
+            tokens_per_sec = None
+        if ttft_ms is not None:
+            self._ttft_ms.append(ttft_ms)
+        if tokens_per_sec:
+            self._stream_tps.append(tokens_per_sec)
+        if use_cache:
+            await self.cache.set(model, prompt, options, {**result, "response": "".join(parts)}, vector)
+        yield {
+            "type": "done",
+            "node": result.get("node"),
+            "model": result.get("model", job.model),
+            "queue_wait_ms": result.get("queue_wait_ms"),
+            "ttft_ms": ttft_ms,
+            "tokens": eval_count or len(parts),
+            "tokens_per_sec": round(tokens_per_sec, 2) if tokens_per_sec else None,
+            "total_ms": round((finished - job.enqueued_at) * 1000, 1),
+            "done_reason": result.get("done_reason"),
+        }
+
+    def _pick_node(self, job: SwarmJob) -> OllamaNode | None:
+        # Retries go to nodes this job has not failed on yet, and cooling-down nodes are avoided
+        # unless nothing else is left.
+        eligible = [node for node in self.nodes if node.endpoint not in job.tried] or self.nodes
+        eligible = [node for node in eligible if node.healthy] or eligible
+        free = [node for node in eligible if node.outstanding < node.max_concurrency]
+        if not free:
+            return None
+        known = [node.tokens_per_sec for node in self.nodes if node.tokens_per_sec]
+        fallback = sum(known) / len(known) if known else _DEFAULT_TOKENS_PER_SEC
+        # A node that already holds the model skips the multi-second load, so it wins over a faster cold one.
+        return min(
+            free,
+            key=lambda node: (not self.residency.is_resident(node.endpoint, job.model), node.load(fallback)),
+        )
+
+    def _place(self, job: SwarmJob) -> tuple[SwarmJob, OllamaNode] | None:
+        node = self._pick_node(job)
+        if node is not None:
+            return job, node
+        # Anything not placed goes back on the queue, so a higher-priority arrival can overtake it later.
+        deferred = [job]
+        placed = None
+        # The head job may only fit busy nodes (a retry avoiding where it failed): let the next job that
+        # fits a free slot go first instead of idling that slot.
+        has_free_slot = any(node.outstanding < node.max_concurrency for node in self.nodes)
+        while has_free_slot and placed is None and not self._queue.empty():
+            candidate = self._queue.get_nowait()
+            if candidate.future is not None and candidate.future.done():
+                continue
+            node = self._pick_node(candidate)
+            if node is None:
+                deferred.append(candidate)
+            else:
+                placed = (candidate, node)
+        for item in deferred:
+            self._queue.put_nowait(item)
+        return placed
+
+    async def _dispatch(self) -> None:
+        while True:
+            job = await self._queue.get()
+            if job.future is not None and job.future.done():
+                continue
+            self._capacity.clear()
+            placed = self._place(job)
+            if placed is None:
+                try:
+                    # Also wake periodically so nodes coming out of cooldown are noticed.
+                    await asyncio.wait_for(self._capacity.wait(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            job, node = placed
+            node.outstanding += 1
+            task = asyncio.create_task(self._run(job, node))
+            job.task = task
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _run(self, job: SwarmJob, node: OllamaNode) -> None:
+        began = time.perf_counter()
+        try:
+            result = await self._execute(job, node)
+        except Exception as exc:
+            node.mark_failed()
+            job.tried.add(node.endpoint)
+            job.attempts += 1
+            # A stream that already emitted tokens cannot be replayed elsewhere.
+            retryable = job.first_token_at is None
+            if retryable and job.attempts <= self.retries and not (job.future and job.future.done()):
+                logger.warning(
+                    "Swarm job failed on %s (attempt %s), retrying elsewhere", node.endpoint, job.attempts
+                )
+                await self._queue.put(job)
+            elif job.future is not None and not job.future.done():
+                job.future.set_exception(SwarmError(f"Generation failed on {node.endpoint}: {exc}"))
+        else:
+            node.mark_ok()
+            self.residency.mark_loaded(node.endpoint, job.model, (result.get("load_duration") or 0) / 1e9)
+            node.observe(int(result.get("eval_count") or 0), (result.get("eval_duration") or 0) / 1e9)
+            if job.future is not None and not job.future.done():
+                result["node"] = node.endpoint
+                result["queue_wait_ms"] = round((began - job.enqueued_at) * 1000, 1)
+                job.future.set_result(result)
+        finally:
+            if job.sink is not None and job.future is not None and job.future.done():
+                job.sink.put_nowait(None)
+            node.outstanding -= 1
+            node.busy_sec += time.perf_counter() - began
+            self._capacity.set()
+
+    async def _execute(self, job: SwarmJob, node: OllamaNode) -> dict[str, Any]:
+        body: dict[str, Any] = {
+            "model": job.model,
+            "prompt": job.prompt,
+            "stream": job.sink is not None,
+            "keep_alive": self.residency.keep_alive(job.model),
+        }
+        if job.options:
+            body["options"] = job.options
+        if job.sink is None:
+            resp = await self._http().post(f"{node.endpoint}/api/generate", json=body)
             resp.raise_for_status()
             return resp.json()
+        async with self._http().stream("POST", f"{node.endpoint}/api/generate", json=body) as resp:
+            resp.raise_for_status()
+            async for line in resp.aiter_lines():
+                if not line.strip():
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise SwarmError(str(chunk["error"]))
+                token = chunk.get("response")
+                if token:
+                    if job.first_token_at is None:
+                        job.first_token_at = time.perf_counter()
+                    job.sink.put_nowait(token)
+                if chunk.get("done"):
+                    return chunk
+        raise SwarmError(f"Stream from {node.endpoint} ended before completion")
+
+    async def embed(self, text: str, *, model: str | None = None) -> list[float] | None:
+        # Embeddings are cheap next to generation, so they skip the job queue and go to the least busy node.
+        candidates = [node for node in self.nodes if node.healthy] or self.nodes
+        node = min(candidates, key=lambda node: node.outstanding / node.max_concurrency)
+        resp = await self._http().post(
+            f"{node.endpoint}/api/embed", json={"model": model or self.model, "input": text}
+        )
+        resp.raise_for_status()
+        embeddings = resp.json().get("embeddings") or []
+        return embeddings[0] if embeddings else None
+
+    async def refresh_residency(self) -> None:
+        async def refresh(node: OllamaNode) -> None:
+            try:
+                resp = await self._http().get(f"{node.endpoint}/api/ps", timeout=5)
+                resp.raise_for_status()
+            except httpx.HTTPError:
+                logger.debug("Residency refresh failed on %s", node.endpoint, exc_info=True)
+                self.residency.mark_unloaded(node.endpoint)
+                return
+            self.residency.update_from_ps(node.endpoint, resp.json())
+
+        await asyncio.gather(*(refresh(node) for node in self.nodes))
+
+    async def _load(self, node: OllamaNode, model: str) -> bool:
+        # An empty-prompt generate makes Ollama load the model (or extend its keep_alive) without generating.
+        try:
+            resp = await self._http().post(
+                f"{node.endpoint}/api/generate",
+                json={"model": model, "keep_alive": self.residency.keep_alive(model)},
+            )
+            resp.raise_for_status()
+        except httpx.HTTPError:
+            logger.warning("Prewarm of %s failed on %s", model, node.endpoint, exc_info=True)
+            return False
+        self.residency.mark_loaded(node.endpoint, model)
+        self.residency.prewarms += 1
+        return True
+
+    async def prewarm(self, models: list[str] | None = None) -> dict[str, list[str]]:
+        models = models or self.residency.hot_models() or [self.model]
+        loads: list[tuple[str, OllamaNode]] = []
+        for model in dict.fromkeys(models):
+            resident = self.residency.resident_on(model)
+            if resident:
+                # Already loaded somewhere: just push its expiry out again.
+                loads.extend((model, node) for node in self.nodes if node.endpoint in resident)
+                continue
+            candidates = [node for node in self.nodes if node.healthy] or self.nodes
+            # Spread hot models across nodes: the node holding the fewest models takes the next one.
+            target = min(
+                candidates,
+                key=lambda node: (
+                    len(self.residency.resident.get(node.endpoint, {}))
+                    + sum(1 for _, planned in loads if planned is node),
+                    node.outstanding,
+                ),
+            )
+            loads.append((model, target))
+        results = await asyncio.gather(*(self._load(node, model) for model, node in loads))
+        warmed: dict[str, list[str]] = {}
+        for (model, node), ok in zip(loads, results):
+            if ok:
+                warmed.setdefault(model, []).append(node.endpoint)
+        return warmed
+
+    def stats(self) -> dict[str, Any]:
+        capacity = self.capacity
+        outstanding = sum(node.outstanding for node in self.nodes)
+        return {
+            "model": self.model,
+            "queue_depth": self._queue.qsize(),
+            "outstanding": outstanding,
+            "capacity": capacity,
+            "utilization": round(outstanding / capacity, 3) if capacity else None,
+            "streams": {
+                "ttft_p50_ms": percentile(list(self._ttft_ms), 50),
+                "ttft_p95_ms": percentile(list(self._ttft_ms), 95),
+                "tokens_per_sec_p50": percentile(list(self._stream_tps), 50),
+                "cancelled": self.streams_cancelled,
+            },
+            "nodes": [node.to_dict() for node in self.nodes],
+            "residency": self.residency.to_dict(),
+            "cache": self.cache.stats() if self.cache is not None else None,
+        }
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any
+
+
+# Generations whose Ollama load_duration exceeds this paid for a cold model load.
+COLD_LOAD_SEC = 0.5
+
+
+class ModelResidency:
+    def __init__(
+        self,
+        *,
+        window_sec: float = 900,
+        hot_threshold: int = 3,
+        min_keep_alive_sec: int = 60,
+        max_keep_alive_sec: int = 1800,
+        pinned: list[str] | None = None,
+    ) -> None:
+        self.window_sec = window_sec
+        self.hot_threshold = max(hot_threshold, 1)
+        self.min_keep_alive_sec = min_keep_alive_sec
+        self.max_keep_alive_sec = max(max_keep_alive_sec, min_keep_alive_sec)
+        self.pinned = list(dict.fromkeys(pinned or []))
+        # endpoint -> model -> monotonic time Ollama is expected to unload it
+        self.resident: dict[str, dict[str, float]] = {}
+        self.cold_loads = 0
+        self.prewarms = 0
+        self._demand: dict[str, deque[float]] = {}
+
+    def record_demand(self, model: str) -> None:
+        self._demand.setdefault(model, deque()).append(time.monotonic())
+
+    def demand(self, model: str) -> int:
+        samples = self._demand.get(model)
+        if not samples:
+            return 0
+        cutoff = time.monotonic() - self.window_sec
+        while samples and samples[0] < cutoff:
+            samples.popleft()
+        return len(samples)
+
+    def keep_alive_sec(self, model: str) -> int:
+        if model in self.pinned:
+            return self.max_keep_alive_sec
+        # Scale linearly with recent demand: a model at the hot threshold is kept for the full window.
+        share = min(self.demand(model) / self.hot_threshold, 1.0)
+        return int(self.min_keep_alive_sec + share * (self.max_keep_alive_sec - self.min_keep_alive_sec))
+
+    def keep_alive(self, model: str) -> str:
+        return f"{self.keep_alive_sec(model)}s"
+
+    def hot_models(self, limit: int = 3) -> list[str]:
+        ranked = sorted(
+            (model for model in self._demand if model not in self.pinned and self.demand(model) >= self.hot_threshold),
+            key=self.demand,
+            reverse=True,
+        )
+        return (self.pinned + ranked)[:max(limit, len(self.pinned))]
+
+    def is_resident(self, endpoint: str, model: str) -> bool:
+        expires = self.resident.get(endpoint, {}).get(model)
+        return expires is not None and expires > time.monotonic()
+
+    def resident_on(self, model: str) -> list[str]:
+        return [endpoint for endpoint in self.resident if self.is_resident(endpoint, model)]
+
+    def mark_loaded(self, endpoint: str, model: str, load_sec: float = 0.0) -> None:
+        self.resident.setdefault(endpoint, {})[model] = time.monotonic() + self.keep_alive_sec(model)
+        if load_sec >= COLD_LOAD_SEC:
+            self.cold_loads += 1
+
+    def mark_unloaded(self, endpoint: str) -> None:
+        self.resident.pop(endpoint, None)
+
+    @staticmethod
+    def _expires_in(expires_at: Any) -> float | None:
+        try:
+            expires = datetime.fromisoformat(str(expires_at).replace("Z", "+00:00"))
+            return expires.timestamp() - time.time()
+        except (TypeError, ValueError, OverflowError, OSError):
+            return None
+
+    def update_from_ps(self, endpoint: str, payload: dict[str, Any]) -> None:
+        # /api/ps is the source of truth. Its expires_at is used when present; otherwise a stored expiry is kept
+        # while still in the future, and anything else gets our own keep_alive for the model.
+        models: dict[str, float] = {}
+        now = time.monotonic()
+        for item in payload.get("models") or []:
+            name = item.get("name") or item.get("model")
+            if not name:
+                continue
+            expires_in = self._expires_in(item.get("expires_at"))
+            if expires_in is not None and expires_in > 0:
+                models[name] = now + expires_in
+                continue
+            stored = self.resident.get(endpoint, {}).get(name)
+            models[name] = stored if stored is not None and stored > now else now + self.keep_alive_sec(name)
+        self.resident[endpoint] = models
+
+    def to_dict(self) -> dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "resident": {
+                endpoint: {model: round(expires - now, 1) for model, expires in models.items() if expires > now}
+                for endpoint, models in self.resident.items()
+            },
+            "demand": {model: self.demand(model) for model in list(self._demand)},
+            "hot": self.hot_models(),
+            "cold_loads": self.cold_loads,
+            "prewarms": self.prewarms,
+        }
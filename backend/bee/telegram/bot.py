@@ -1,29 +1,308 @@
 import asyncio
+import logging
+import os
+import tempfile
+import time
+from collections.abc import Coroutine
+from typing import Any
+
 from aiogram import Bot, Dispatcher, F
-from aiogram.filters import CommandStart
-from aiogram.types import Message
+from aiogram.filters import Command, CommandObject, CommandStart
+from aiogram.types import Message, Update
+from bee.memory.evermemos import EvermemOS
 from bee.state import BEEState
+from bee.swarm.ollama_swarm import OllamaSwarm, SwarmError
+from bee.telegram.live import LiveMessage
+from bee.telegram.outbox import TelegramOutbox
+from bee.tools.web import WebTools
+from bee.tools.youtube import YouTubeTranscriber
+
+
+logger = logging.getLogger(__name__)
+
+POLLING = "polling"
+WEBHOOK = "webhook"
+
+# Audio types the transcription API accepts; the download is named from this, never from the sender.
+_AUDIO_SUFFIXES = {
+    "audio/ogg": ".ogg",
+    "audio/opus": ".ogg",
+    "audio/mpeg": ".mp3",
+    "audio/mp3": ".mp3",
+    "audio/mp4": ".m4a",
+    "audio/x-m4a": ".m4a",
+    "audio/aac": ".m4a",
+    "audio/wav": ".wav",
+    "audio/x-wav": ".wav",
+    "audio/webm": ".webm",
+    "audio/flac": ".flac",
+    "audio/x-flac": ".flac",
+}
 
 
 class TelegramBot:
-    def __init__(self, token: str, state: BEEState) -> None:
+    def __init__(
+        self,
+        token: str,
+        state: BEEState,
+        *,
+        admin_chat_id: str | None = None,
+        update_concurrency: int = 8,
+        max_backlog: int = 200,
+        global_rate: float = 25.0,
+        chat_rate: float = 1.0,
+        chat_burst: float = 3.0,
+        evermem: EvermemOS | None = None,
+        web_tools: WebTools | None = None,
+        swarm: OllamaSwarm | None = None,
+        transcriber: YouTubeTranscriber | None = None,
+        voice_downloads: int = 4,
+    ) -> None:
         self.bot = Bot(token=token)
         self.dp = Dispatcher()
         self.state = state
+        self.admin_chat_id = admin_chat_id
+        self.evermem = evermem
+        self.web_tools = web_tools
+        self.swarm = swarm
+        self.transcriber = transcriber
+        self._downloads = asyncio.Semaphore(max(voice_downloads, 1))
+        self._background: set[asyncio.Task] = set()
+        self.outbox = TelegramOutbox(self.bot, global_rate=global_rate, chat_rate=chat_rate, chat_burst=chat_burst)
+        self.mode: str | None = None
+        self.update_concurrency = max(update_concurrency, 1)
+        self.max_backlog = max(max_backlog, self.update_concurrency)
+        self.updates_processed = 0
+        self.updates_rejected = 0
+        self._limit = asyncio.Semaphore(self.update_concurrency)
+        self._pending: set[asyncio.Task] = set()
+        self._polling_task: asyncio.Task | None = None
         self._wire_handlers()
 
     def _wire_handlers(self) -> None:
         @self.dp.message(CommandStart())
         async def start(message: Message) -> None:
-            await message.answer("B.E.E. online. Use /status to check heartbeat and goals.")
+            self.outbox.send(message.chat.id, "B.E.E. online. Use /status for heartbeat and goals, /search or /research to look things up, /ask to talk to the swarm.")
 
         @self.dp.message(F.text == "/status")
         async def status(message: Message) -> None:
             goals = ", ".join(self.state.memory_goals.goals) or "none"
-            await message.answer(f"Heartbeat: {self.state.heartbeat_running}. Goals: {goals}.")
+            self.outbox.send(message.chat.id, f"Heartbeat: {self.state.heartbeat_running}. Goals: {goals}.")
+
+        @self.dp.message(Command("search"))
+        async def search(message: Message, command: CommandObject) -> None:
+            if not command.args:
+                self.outbox.send(message.chat.id, "Usage: /search <query>")
+                return
+            self._spawn(self._search(message.chat.id, command.args))
+
+        @self.dp.message(Command("research"))
+        async def research(message: Message, command: CommandObject) -> None:
+            if not command.args:
+                self.outbox.send(message.chat.id, "Usage: /research <query>")
+                return
+            self._spawn(self._research(message.chat.id, command.args))
+
+        @self.dp.message(Command("ask"))
+        async def ask(message: Message, command: CommandObject) -> None:
+            if not command.args:
+                self.outbox.send(message.chat.id, "Usage: /ask <prompt>")
+                return
+            self._spawn(self._ask(message.chat.id, command.args))
+
+        @self.dp.message(F.voice | F.audio)
+        async def voice_note(message: Message) -> None:
+            if self.transcriber is None or not self.transcriber.enabled:
+                self.outbox.send(message.chat.id, "Voice transcription is not configured.")
+                return
+            self._spawn(self._ingest_voice(message))
+
+    def _spawn(self, coro: Coroutine[Any, Any, None]) -> None:
+        # Slow commands run detached so they never hold one of the update_concurrency slots.
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _ingest_voice(self, message: Message) -> None:
+        media = message.voice or message.audio
+        live = LiveMessage(self.outbox, message.chat.id, placeholder="Voice note received, downloading…")
+        live.start()
+        timings: dict[str, float] = {}
+        began = time.perf_counter()
+        try:
+            with tempfile.TemporaryDirectory(prefix="bee-voice-") as workdir:
+                suffix = ".ogg" if message.voice else _AUDIO_SUFFIXES.get((media.mime_type or "").lower(), ".mp3")
+                path = os.path.join(workdir, "audio" + suffix)
+                async with self._downloads:
+                    await self.bot.download(media, destination=path, timeout=120)
+                timings["download"] = time.perf_counter() - began
+                live.update("Transcribing…")
+
+                began = time.perf_counter()
+                text = (await self.transcriber.transcribe_audio(path)).strip()
+                timings["transcribe"] = time.perf_counter() - began
+
+            if text and self.evermem is not None and self.evermem.enabled:
+                began = time.perf_counter()
+                sender = message.from_user.full_name if message.from_user else "unknown"
+                result = await self.evermem.add_memory(
+                    content=f"Telegram voice note from {sender} ({media.duration}s):\n\n{text}"
+                )
+                timings["memory"] = time.perf_counter() - began
+                if result is None:
+                    text += "\n\n(memory write failed)"
+        except Exception as exc:
+            logger.warning("Voice note ingestion failed chat=%s", message.chat.id, exc_info=True)
+            live.finish(f"Voice note failed: {exc}")
+            return
+
+        stages = " · ".join(f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in timings.items())
+        live.finish(f"Transcript ({media.duration}s):\n{text or '(no speech detected)'}\n\n{stages}")
+
+    async def _search(self, chat_id: int, query: str) -> None:
+        live = LiveMessage(self.outbox, chat_id, placeholder=f"Searching memory for “{query}”…")
+        live.start()
+        if self.evermem is None or not self.evermem.enabled:
+            live.finish("Memory is not configured.")
+            return
+        try:
+            contents = await self.evermem.search_contents(query, top_k=5)
+        except Exception as exc:
+            logger.warning("Telegram /search failed chat=%s", chat_id, exc_info=True)
+            live.finish(f"Search failed: {exc}")
+            return
+        if not contents:
+            live.finish(f"No memories found for “{query}”.")
+            return
+        lines = [f"Memories for “{query}”:"]
+        lines.extend(f"{index}. {content.strip()[:600]}" for index, content in enumerate(contents, 1))
+        live.finish("\n\n".join(lines))
+
+    async def _research(self, chat_id: int, query: str) -> None:
+        live = LiveMessage(self.outbox, chat_id, placeholder=f"Researching “{query}”…")
+        live.start()
+        if self.web_tools is None or not self.web_tools.api_key:
+            live.finish("Web search is not configured.")
+            return
+        header = f"Research: {query}"
+        hits: list[str] = []
+        pages: list[str] = []
+        try:
+            async for event in self.web_tools.research(query, count=5, scrape_top=3, max_chars=4000, deadline_sec=20):
+                if event["type"] == "search":
+                    hits = [f"• {hit.get('title') or hit.get('url')}\n  {hit.get('url')}" for hit in event["results"]]
+                elif event["type"] == "result" and event.get("content"):
+                    snippet = " ".join(event["content"].split())[:500]
+                    pages.append(f"{event.get('title') or event['url']}\n{snippet}")
+                else:
+                    continue
+                live.update("\n\n".join([header, "\n".join(hits), *pages]))
+        except Exception as exc:
+            logger.warning("Telegram /research failed chat=%s", chat_id, exc_info=True)
+            live.finish("\n\n".join([header, "\n".join(hits), *pages, f"Research failed: {exc}"]))
+            return
+        if not hits:
+            live.finish(f"No web results for “{query}”.")
+            return
+        live.finish("\n\n".join([header, "\n".join(hits), *pages]))
+
+    async def _ask(self, chat_id: int, prompt: str) -> None:
+        live = LiveMessage(self.outbox, chat_id, placeholder="Thinking…")
+        live.start()
+        if self.swarm is None:
+            live.finish("The swarm is not configured.")
+            return
+        parts: list[str] = []
+        try:
+            async for event in self.swarm.generate_stream(prompt):
+                if event["type"] == "token":
+                    parts.append(event["text"])
+                    live.update("".join(parts))
+        except SwarmError as exc:
+            parts.append(f"\n\n[generation failed: {exc}]")
+        except Exception as exc:
+            logger.warning("Telegram /ask failed chat=%s", chat_id, exc_info=True)
+            parts.append(f"\n\n[ask failed: {exc}]")
+        live.finish("".join(parts))
+
+    def notify(self, text: str, *, key: str | None = None) -> asyncio.Future | None:
+        # Alerts go to the admin chat; keyed alerts are coalesced and edited in place instead of piling up.
+        if not self.admin_chat_id:
+            return None
+        if key:
+            return self.outbox.status(self.admin_chat_id, key, text)
+        return self.outbox.send(self.admin_chat_id, text)
 
     async def run(self) -> None:
+        # Polling and a registered webhook are mutually exclusive on Telegram's side.
+        await self.bot.delete_webhook(drop_pending_updates=False)
         await self.dp.start_polling(self.bot)
 
     def run_in_background(self) -> asyncio.Task:
-        return asyncio.create_task(self.run())
+        self.mode = POLLING
+        self._polling_task = asyncio.create_task(self.run())
+        return self._polling_task
+
+    async def start_webhook(self, url: str, secret: str) -> bool:
+        try:
+            await self.bot.set_webhook(
+                url,
+                secret_token=secret,
+                allowed_updates=self.dp.resolve_used_update_types(),
+                max_connections=self.update_concurrency,
+            )
+        except Exception:
+            logger.warning("Telegram set_webhook failed url=%s", url, exc_info=True)
+            return False
+        self.mode = WEBHOOK
+        return True
+
+    async def start(self, webhook_url: str | None, secret: str) -> str:
+        if webhook_url and await self.start_webhook(webhook_url, secret):
+            return WEBHOOK
+        if webhook_url:
+            logger.warning("Falling back to Telegram long polling")
+        self.run_in_background()
+        return POLLING
+
+    async def _process(self, update: Update) -> None:
+        async with self._limit:
+            try:
+                await self.dp.feed_update(self.bot, update)
+            except Exception:
+                logger.warning("Telegram update %s failed", update.update_id, exc_info=True)
+            self.updates_processed += 1
+
+    def feed_webhook(self, payload: dict[str, Any]) -> bool:
+        # Telegram redelivers on a non-2xx reply, so a full backlog is pushed back rather than buffered.
+        if len(self._pending) >= self.max_backlog:
+            self.updates_rejected += 1
+            return False
+        update = Update.model_validate(payload, context={"bot": self.bot})
+        task = asyncio.create_task(self._process(update))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "pending_updates": len(self._pending),
+            "update_concurrency": self.update_concurrency,
+            "processed": self.updates_processed,
+            "rejected": self.updates_rejected,
+            "background_tasks": len(self._background),
+            "outbox": self.outbox.stats(),
+        }
+
+    async def close(self) -> None:
+        if self._polling_task is not None:
+            self._polling_task.cancel()
+            await asyncio.gather(self._polling_task, return_exceptions=True)
+        if self._pending:
+            await asyncio.wait(self._pending, timeout=5)
+        for task in list(self._background):
+            task.cancel()
+        await asyncio.gather(*self._background, return_exceptions=True)
+        await self.outbox.close()
+        await self.bot.session.close()
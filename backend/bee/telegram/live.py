@@ -0,0 +1,83 @@
+import asyncio
+import time
+import uuid
+
+from bee.telegram.outbox import TelegramOutbox
+
+
+# Telegram rejects messages over 4096 characters; leave room for the cursor.
+MESSAGE_LIMIT = 4000
+CURSOR = " ▌"
+
+
+def split_point(text: str, limit: int) -> int:
+    if len(text) <= limit:
+        return len(text)
+    # Prefer breaking at a paragraph, then a line, then a word.
+    for separator in ("\n\n", "\n", " "):
+        cut = text.rfind(separator, 0, limit)
+        if cut > limit // 2:
+            return cut + len(separator)
+    return limit
+
+
+class LiveMessage:
+    def __init__(
+        self,
+        outbox: TelegramOutbox,
+        chat_id: int | str,
+        *,
+        placeholder: str = "Working…",
+        min_interval: float = 1.5,
+        limit: int = MESSAGE_LIMIT,
+    ) -> None:
+        self.outbox = outbox
+        self.chat_id = chat_id
+        self.placeholder = placeholder
+        self.min_interval = min_interval
+        self.limit = limit
+        self.messages = 0
+        self._key = self._new_key()
+        self._text = ""
+        # Characters of the output already frozen into earlier messages.
+        self._committed = 0
+        self._pushed_at = 0.0
+
+    @staticmethod
+    def _new_key() -> str:
+        return f"live:{uuid.uuid4().hex}"
+
+    def start(self) -> asyncio.Future:
+        self.messages = 1
+        self._pushed_at = time.monotonic()
+        return self.outbox.status(self.chat_id, self._key, self.placeholder)
+
+    def _roll(self) -> None:
+        # Freeze full messages and continue the output in a follow-up message.
+        while len(self._text) - self._committed > self.limit:
+            cut = self._committed + split_point(self._text[self._committed :], self.limit)
+            self.outbox.status(self.chat_id, self._key, self._text[self._committed : cut].rstrip())
+            self.outbox.forget_status(self.chat_id, self._key)
+            self._key = self._new_key()
+            self._committed = cut
+            self.messages += 1
+
+    def update(self, text: str) -> None:
+        self._text = text
+        self._roll()
+        now = time.monotonic()
+        # Edits are throttled here; anything faster would only be coalesced by the outbox anyway.
+        if now - self._pushed_at < self.min_interval:
+            return
+        self._pushed_at = now
+        visible = self._text[self._committed :].strip()
+        self.outbox.status(self.chat_id, self._key, (visible or self.placeholder) + CURSOR)
+
+    def finish(self, text: str | None = None) -> asyncio.Future:
+        if text is not None:
+            self._text = text
+        self._roll()
+        visible = self._text[self._committed :].strip()
+        future = self.outbox.status(self.chat_id, self._key, visible or "(no output)")
+        self.outbox.forget_status(self.chat_id, self._key)
+        return future
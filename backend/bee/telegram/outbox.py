@@ -0,0 +1,279 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+
+
+logger = logging.getLogger(__name__)
+
+_STATUS_IDS_MAX = 1000
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = max(rate, 0.001)
+        self.burst = max(burst, 1.0)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    @property
+    def full(self) -> bool:
+        self._refill()
+        return self.tokens >= self.burst
+
+    def delay(self) -> float:
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self._refill()
+        self.tokens -= 1
+
+
+@dataclass
+class OutboundMessage:
+    chat_id: int | str
+    text: str
+    kwargs: dict[str, Any] = field(default_factory=dict)
+    status_key: str | None = None
+    # Set for an in-place edit of a message that was already delivered.
+    edit_message_id: int | None = None
+    future: asyncio.Future | None = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class TelegramOutbox:
+    def __init__(
+        self,
+        bot: Bot,
+        *,
+        global_rate: float = 25.0,
+        chat_rate: float = 1.0,
+        chat_burst: float = 3.0,
+        max_attempts: int = 3,
+    ) -> None:
+        self.bot = bot
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_attempts = max(max_attempts, 1)
+        self.sent = 0
+        self.edited = 0
+        self.coalesced = 0
+        self.failed = 0
+        self.flood_waits = 0
+        self.flood_wait_sec = 0.0
+        self._global = TokenBucket(global_rate, global_rate)
+        self._buckets: dict[int | str, TokenBucket] = {}
+        # chat -> queued messages; the order of chats is the round-robin order.
+        self._chats: OrderedDict[int | str, deque[OutboundMessage]] = OrderedDict()
+        self._busy_chats: set[int | str] = set()
+        # (chat, status key) -> queued message still open for coalescing, or the id of the delivered one.
+        self._pending_status: dict[tuple[int | str, str], OutboundMessage] = {}
+        self._status_ids: OrderedDict[tuple[int | str, str], int] = OrderedDict()
+        self._attempts: dict[int, int] = {}
+        self._paused_until = 0.0
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._inflight: set[asyncio.Task] = set()
+
+    @property
+    def depth(self) -> int:
+        return sum(len(queue) for queue in self._chats.values())
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def _enqueue(self, item: OutboundMessage, *, front: bool = False) -> asyncio.Future:
+        if item.future is None:
+            item.future = asyncio.get_running_loop().create_future()
+        queue = self._chats.setdefault(item.chat_id, deque())
+        if front:
+            queue.appendleft(item)
+        else:
+            queue.append(item)
+        self._ensure_running()
+        self._wake.set()
+        return item.future
+
+    def send(self, chat_id: int | str, text: str, **kwargs: Any) -> asyncio.Future:
+        # Resolves to the sent Message, or None if delivery failed; awaiting it is optional.
+        return self._enqueue(OutboundMessage(chat_id, text, kwargs))
+
+    def status(self, chat_id: int | str, key: str, text: str, **kwargs: Any) -> asyncio.Future:
+        # Repeated status updates collapse into one message: a queued one gets its text replaced,
+        # a delivered one is edited in place.
+        slot = (chat_id, key)
+        pending = self._pending_status.get(slot)
+        if pending is not None:
+            pending.text = text
+            pending.kwargs = kwargs
+            self.coalesced += 1
+            return pending.future
+        item = OutboundMessage(chat_id, text, kwargs, status_key=key, edit_message_id=self._status_ids.get(slot))
+        self._pending_status[slot] = item
+        return self._enqueue(item)
+
+    def forget_status(self, chat_id: int | str, key: str) -> None:
+        self._status_ids.pop((chat_id, key), None)
+
+    def _bucket(self, chat_id: int | str) -> TokenBucket:
+        bucket = self._buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._buckets[chat_id] = TokenBucket(self.chat_rate, self.chat_burst)
+        return bucket
+
+    def _next(self) -> tuple[OutboundMessage | None, float | None]:
+        pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            return None, pause
+        wait: float | None = None
+        for chat_id in list(self._chats):
+            queue = self._chats[chat_id]
+            if not queue:
+                del self._chats[chat_id]
+                bucket = self._buckets.get(chat_id)
+                # A refilled bucket carries no state worth keeping for an idle chat.
+                if bucket is not None and chat_id not in self._busy_chats and bucket.full:
+                    del self._buckets[chat_id]
+                continue
+            # One delivery per chat at a time keeps messages in order.
+            if chat_id in self._busy_chats:
+                continue
+            delay = max(self._bucket(chat_id).delay(), self._global.delay())
+            if delay > 0:
+                wait = delay if wait is None else min(wait, delay)
+                continue
+            self._global.take()
+            self._bucket(chat_id).take()
+            self._chats.move_to_end(chat_id)
+            item = queue.popleft()
+            if item.status_key is not None:
+                self._pending_status.pop((chat_id, item.status_key), None)
+            return item, None
+        return None, wait
+
+    async def _run(self) -> None:
+        while True:
+            item, wait = self._next()
+            if item is None:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self._busy_chats.add(item.chat_id)
+            task = asyncio.create_task(self._deliver(item))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    def _resolve(self, item: OutboundMessage, result: Any) -> None:
+        self._attempts.pop(id(item), None)
+        if item.future is not None and not item.future.done():
+            item.future.set_result(result)
+
+    async def _deliver(self, item: OutboundMessage) -> None:
+        try:
+            if item.edit_message_id is not None:
+                result = await self.bot.edit_message_text(
+                    text=item.text, chat_id=item.chat_id, message_id=item.edit_message_id, **item.kwargs
+                )
+                self.edited += 1
+            else:
+                result = await self.bot.send_message(item.chat_id, item.text, **item.kwargs)
+                self.sent += 1
+        except TelegramRetryAfter as exc:
+            # Flood control applies to the whole bot, so every chat waits out retry_after.
+            self.flood_waits += 1
+            self.flood_wait_sec += exc.retry_after
+            self._paused_until = max(self._paused_until, time.monotonic() + exc.retry_after)
+            logger.warning("Telegram flood wait %ss chat=%s", exc.retry_after, item.chat_id)
+            self._retry(item)
+        except TelegramBadRequest as exc:
+            if "message is not modified" in str(exc):
+                self._resolve(item, None)
+            elif item.edit_message_id is not None and item.status_key is not None:
+                # The status message is gone (deleted or too old to edit): post a fresh one.
+                self.forget_status(item.chat_id, item.status_key)
+                item.edit_message_id = None
+                self._retry(item)
+            else:
+                self.failed += 1
+                logger.warning("Telegram send rejected chat=%s", item.chat_id, exc_info=True)
+                self._resolve(item, None)
+        except Exception:
+            self.failed += 1
+            logger.warning("Telegram send failed chat=%s", item.chat_id, exc_info=True)
+            self._resolve(item, None)
+        else:
+            if item.status_key is not None and item.edit_message_id is None and result is not None:
+                slot = (item.chat_id, item.status_key)
+                self._status_ids[slot] = result.message_id
+                self._status_ids.move_to_end(slot)
+                while len(self._status_ids) > _STATUS_IDS_MAX:
+                    self._status_ids.popitem(last=False)
+                # An update queued while this first send was in flight becomes an edit of it.
+                pending = self._pending_status.get(slot)
+                if pending is not None and pending.edit_message_id is None:
+                    pending.edit_message_id = result.message_id
+            self._resolve(item, result)
+        finally:
+            self._busy_chats.discard(item.chat_id)
+            self._wake.set()
+
+    def _retry(self, item: OutboundMessage) -> None:
+        attempts = self._attempts.get(id(item), 0) + 1
+        if attempts >= self.max_attempts:
+            self.failed += 1
+            self._resolve(item, None)
+            return
+        self._attempts[id(item)] = attempts
+        if item.status_key is not None:
+            slot = (item.chat_id, item.status_key)
+            newer = self._pending_status.get(slot)
+            if newer is not None:
+                # A newer status is already queued; it supersedes this one.
+                newer.edit_message_id = newer.edit_message_id or item.edit_message_id
+                self._resolve(item, None)
+                return
+            self._pending_status[slot] = item
+        self._enqueue(item, front=True)
+
+    def stats(self) -> dict[str, Any]:
+        now = time.monotonic()
+        oldest = min((queue[0].enqueued_at for queue in self._chats.values() if queue), default=None)
+        return {
+            "queue_depth": self.depth,
+            "chats_queued": sum(1 for queue in self._chats.values() if queue),
+            "oldest_wait_sec": round(now - oldest, 3) if oldest is not None else None,
+            "sent": self.sent,
+            "edited": self.edited,
+            "coalesced": self.coalesced,
+            "failed": self.failed,
+            "flood_waits": self.flood_waits,
+            "flood_wait_sec": round(self.flood_wait_sec, 1),
+            "paused_for_sec": round(max(self._paused_until - now, 0.0), 1),
+        }
+
+    async def close(self, timeout: float = 5.0) -> None:
+        deadline = time.monotonic() + timeout
+        while (self.depth or self._inflight) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for task in list(self._inflight):
+            task.cancel()
+        await asyncio.gather(*self._inflight, return_exceptions=True)
@@ -1,14 +1,22 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Any
+import time
+from collections.abc import AsyncIterator
+from typing import TYPE_CHECKING, Any
 
-from browser_use_sdk import AsyncBrowserUse
+import httpx
 from pydantic import BaseModel, Field
 
+if TYPE_CHECKING:
+    from browser_use_sdk import AsyncBrowserUse
+
 
 logger = logging.getLogger(__name__)
 
+_CACHE_MAX_ENTRIES = 1000
+
 
 class PageExtraction(BaseModel):
     url: str | None = Field(default=None, description="Original URL")
@@ -18,35 +26,96 @@ class PageExtraction(BaseModel):
 
 
 class BrowserUseClient:
-    def __init__(self, api_key: str | None, llm: str | None = None) -> None:
+    def __init__(
+        self,
+        api_key: str | None,
+        llm: str | None = None,
+        *,
+        concurrency: int = 4,
+        cache_ttl_sec: float = 900,
+        reuse_sessions: bool = True,
+    ) -> None:
         self.api_key = api_key
         self.llm = llm
+        self.concurrency = max(concurrency, 1)
+        self.cache_ttl_sec = cache_ttl_sec
+        self.reuse_sessions = reuse_sessions
+        self._client: AsyncBrowserUse | None = None
+        self._http: httpx.AsyncClient | None = None
+        self._limit: asyncio.Semaphore | None = None
+        self._sessions: list[str] = []
+        self._idle_sessions: list[str] = []
+        self._cache: dict[str, tuple[float, dict[str, Any]]] = {}
+        self._inflight: dict[str, asyncio.Task] = {}
 
     @property
     def enabled(self) -> bool:
         return bool(self.api_key)
 
-    async def extract_text(self, url: str) -> dict[str, Any]:
-        if not self.api_key:
-            return {"ok": False, "error": "BROWSER_USE_API_KEY not set"}
+    def _get_client(self) -> AsyncBrowserUse:
+        if self._client is None:
+            from browser_use_sdk import AsyncBrowserUse
 
+            self._http = httpx.AsyncClient(timeout=60)
+            self._client = AsyncBrowserUse(api_key=self.api_key, httpx_client=self._http)
+            self._limit = asyncio.Semaphore(self.concurrency)
+        return self._client
+
+    async def _acquire_session(self, client: AsyncBrowserUse) -> str | None:
+        if not self.reuse_sessions:
+            return None
+        if self._idle_sessions:
+            return self._idle_sessions.pop()
+        try:
+            session = await client.sessions.create_session(keep_alive=True)
+        except Exception:
+            logger.warning("Browser-use session create failed; running without a session", exc_info=True)
+            return None
+        self._sessions.append(session.id)
+        return session.id
+
+    async def _discard_session(self, client: AsyncBrowserUse, session_id: str) -> None:
+        if session_id in self._sessions:
+            self._sessions.remove(session_id)
         try:
-            async with AsyncBrowserUse(api_key=self.api_key, llm=self.llm) as client:
+            await client.sessions.delete_session(session_id)
+        except Exception:
+            logger.debug("Browser-use session delete failed id=%s", session_id, exc_info=True)
+
+    async def _run_task(self, url: str) -> dict[str, Any]:
+        client = self._get_client()
+        assert self._limit is not None
+        async with self._limit:
+            session_id = await self._acquire_session(client)
+            options: dict[str, Any] = {}
+            if self.llm:
+                options["llm"] = self.llm
+            if session_id:
+                options["session_id"] = session_id
+            try:
                 task = await client.tasks.create_task(
                     task=(
                         f"Open {url} and extract the page title, a short summary, "
                         "and the main readable text. Only respond with the schema."
                     ),
                     schema=PageExtraction,
+                    start_url=url,
+                    **options,
                 )
                 result = await task.complete()
-        except Exception as exc:
-            logger.warning("Browser-use extraction failed", exc_info=True)
-            return {"ok": False, "error": str(exc)}
+            except Exception as exc:
+                logger.warning("Browser-use extraction failed", exc_info=True)
+                if session_id:
+                    await self._discard_session(client, session_id)
+                return {"ok": False, "error": str(exc)}
+            if session_id:
+                self._idle_sessions.append(session_id)
 
         output = None
         if result is not None:
-            if hasattr(result, "output"):
+            if getattr(result, "parsed_output", None) is not None:
+                output = result.parsed_output
+            elif hasattr(result, "output"):
                 output = result.output
             elif hasattr(result, "result") and hasattr(result.result, "output"):
                 output = result.result.output
@@ -61,3 +130,52 @@ class BrowserUseClient:
             "output": output,
             "task_id": getattr(result, "id", None) or getattr(result, "task_id", None),
         }
+
+    async def extract_text(self, url: str) -> dict[str, Any]:
+        if not self.api_key:
+            return {"ok": False, "error": "BROWSER_USE_API_KEY not set"}
+
+        cached = self._cache.get(url)
+        if cached is not None:
+            if cached[0] > time.monotonic():
+                return {**cached[1], "cached": True}
+            del self._cache[url]
+
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.create_task(self._run_task(url))
+            self._inflight[url] = task
+            task.add_done_callback(lambda _: self._inflight.pop(url, None))
+        result = await asyncio.shield(task)
+        if result.get("ok") and self.cache_ttl_sec > 0:
+            self._cache[url] = (time.monotonic() + self.cache_ttl_sec, result)
+            if len(self._cache) > _CACHE_MAX_ENTRIES:
+                now = time.monotonic()
+                for key in [key for key, (expires, _) in self._cache.items() if expires <= now]:
+                    del self._cache[key]
+                while len(self._cache) > _CACHE_MAX_ENTRIES:
+                    del self._cache[next(iter(self._cache))]
+        return dict(result)
+
+    async def extract_many(self, urls: list[str]) -> AsyncIterator[dict[str, Any]]:
+        async def run(url: str) -> dict[str, Any]:
+            return {"url": url, **await self.extract_text(url)}
+
+        tasks = [asyncio.create_task(run(url)) for url in dict.fromkeys(urls)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            for session_id in list(self._sessions):
+                await self._discard_session(self._client, session_id)
+        self._idle_sessions.clear()
+        if self._http is not None:
+            await self._http.aclose()
+        self._client = None
+        self._http = None
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from typing import Any
+from urllib.parse import urlparse
+
+from bee.metrics import percentile
+from bee.tools.browser_use import BrowserUseClient
+from bee.tools.web import WebTools
+
+
+logger = logging.getLogger(__name__)
+
+HTTP_TIER = "http"
+BROWSER_TIER = "browser"
+
+
+class TieredExtractor:
+    def __init__(
+        self,
+        web_tools: WebTools,
+        browser_use: BrowserUseClient,
+        *,
+        routes_path: str | None = None,
+        min_chars: int = 400,
+        min_quality: float = 0.6,
+        reprobe_every: int = 20,
+        max_chars: int = 20000,
+    ) -> None:
+        self.web_tools = web_tools
+        self.browser_use = browser_use
+        self.routes_path = routes_path
+        self.min_chars = min_chars
+        self.min_quality = min_quality
+        self.reprobe_every = max(reprobe_every, 1)
+        self.max_chars = max_chars
+        # host -> {"browser": bool, "since_probe": int}
+        self.routes: dict[str, dict[str, Any]] = {}
+        self.escalations = 0
+        self._hits = {HTTP_TIER: 0, BROWSER_TIER: 0}
+        self._latency: dict[str, deque[float]] = {HTTP_TIER: deque(maxlen=500), BROWSER_TIER: deque(maxlen=500)}
+        self._load_routes()
+
+    def _load_routes(self) -> None:
+        if not self.routes_path or not os.path.exists(self.routes_path):
+            return
+        try:
+            with open(self.routes_path, "r", encoding="utf-8") as handle:
+                self.routes = json.load(handle)
+        except (OSError, ValueError):
+            logger.warning("Extractor routes unreadable path=%s", self.routes_path, exc_info=True)
+
+    def _write_routes(self, routes: dict[str, dict[str, Any]]) -> None:
+        directory = os.path.dirname(self.routes_path or "")
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.routes_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(routes, handle)
+        os.replace(tmp_path, self.routes_path)
+
+    async def _save_routes(self) -> None:
+        if not self.routes_path:
+            return
+        try:
+            await asyncio.to_thread(self._write_routes, {host: dict(route) for host, route in self.routes.items()})
+        except OSError:
+            logger.warning("Extractor routes save failed path=%s", self.routes_path, exc_info=True)
+
+    def score(self, scraped: dict[str, Any]) -> float:
+        extracted = scraped.get("extracted")
+        if scraped.get("status_code") != 200 or not extracted:
+            return 0.0
+        text = extracted.get("text") or ""
+        quality = min(len(text) / self.min_chars, 1.0)
+        if extracted.get("js_shell"):
+            quality *= 0.2
+        # Script-heavy pages with little prose are usually client-rendered.
+        if extracted.get("scripts", 0) > 20 and len(text) < self.min_chars * 2:
+            quality *= 0.5
+        return round(quality, 3)
+
+    def _record(self, tier: str, began: float) -> float:
+        elapsed = (time.perf_counter() - began) * 1000
+        self._hits[tier] += 1
+        self._latency[tier].append(elapsed)
+        return round(elapsed, 1)
+
+    def _wants_http(self, host: str, force_browser: bool) -> bool:
+        if force_browser and self.browser_use.enabled:
+            return False
+        route = self.routes.get(host)
+        if not route or not route.get("browser") or not self.browser_use.enabled:
+            return True
+        route["since_probe"] = route.get("since_probe", 0) + 1
+        if route["since_probe"] >= self.reprobe_every:
+            route["since_probe"] = 0
+            return True
+        return False
+
+    async def _learn(self, host: str, needs_browser: bool) -> None:
+        route = self.routes.get(host)
+        if route is not None and bool(route.get("browser")) == needs_browser:
+            return
+        self.routes[host] = {"browser": needs_browser, "since_probe": 0}
+        await self._save_routes()
+
+    async def extract(self, url: str, *, force_browser: bool = False) -> dict[str, Any]:
+        host = (urlparse(url).hostname or "").lower()
+        scraped: dict[str, Any] | None = None
+        quality = 0.0
+
+        if self._wants_http(host, force_browser):
+            began = time.perf_counter()
+            scraped = await self.web_tools.scrape(url, max_chars=self.max_chars, extract=True)
+            quality = self.score(scraped)
+            if quality >= self.min_quality or not self.browser_use.enabled:
+                latency = self._record(HTTP_TIER, began)
+                extracted = scraped.get("extracted") or {}
+                if quality >= self.min_quality:
+                    await self._learn(host, needs_browser=False)
+                if not extracted.get("text"):
+                    return {
+                        "ok": False,
+                        "error": "No readable text and BROWSER_USE_API_KEY not set",
+                        "tier": HTTP_TIER,
+                        "quality": quality,
+                        "latency_ms": latency,
+                    }
+                return {
+                    "ok": True,
+                    "status": "finished",
+                    "output": {
+                        "url": url,
+                        "title": extracted.get("title"),
+                        "summary": extracted.get("description"),
+                        "text": extracted.get("text"),
+                    },
+                    "tier": HTTP_TIER,
+                    "quality": quality,
+                    "latency_ms": latency,
+                }
+            self.escalations += 1
+            logger.info("Escalating extraction to browser-use host=%s quality=%s", host, quality)
+
+        began = time.perf_counter()
+        result = await self.browser_use.extract_text(url)
+        latency = self._record(BROWSER_TIER, began)
+        if result.get("ok") and scraped is not None:
+            await self._learn(host, needs_browser=True)
+        result["tier"] = BROWSER_TIER
+        result["latency_ms"] = latency
+        if scraped is not None:
+            result["quality"] = quality
+        return result
+
+    def stats(self) -> dict[str, Any]:
+        total = sum(self._hits.values())
+        tiers: dict[str, Any] = {}
+        for tier, hits in self._hits.items():
+            samples = list(self._latency[tier])
+            tiers[tier] = {
+                "hits": hits,
+                "hit_rate": round(hits / total, 3) if total else None,
+                "p50_ms": percentile(samples, 50),
+                "p95_ms": percentile(samples, 95),
+            }
+        return {
+            "requests": total,
+            "escalations": self.escalations,
+            "browser_hosts": sorted(host for host, route in self.routes.items() if route.get("browser")),
+            "tiers": tiers,
+        }
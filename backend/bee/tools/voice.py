@@ -1,18 +1,209 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+from collections.abc import AsyncIterator
+from typing import Any
+
 import httpx
 
+from bee.cache import DiskCache, TieredCache
+
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_END = re.compile(r"(?<=[.!?;:])\s+|\n+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_phrase(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def split_sentences(text: str, min_chars: int = 24) -> list[str]:
+    # Very short fragments ("Hi." / "OK.") are merged forward so each upstream call carries enough context.
+    sentences: list[str] = []
+    pending = ""
+    for part in _SENTENCE_END.split(text):
+        part = part.strip()
+        if not part:
+            continue
+        pending = f"{pending} {part}".strip()
+        if len(pending) >= min_chars:
+            sentences.append(pending)
+            pending = ""
+    if pending:
+        if sentences and len(pending) < min_chars:
+            sentences[-1] = f"{sentences[-1]} {pending}"
+        else:
+            sentences.append(pending)
+    return sentences
+
 
 class VoiceClient:
-    def __init__(self, api_key: str | None) -> None:
+    def __init__(
+        self,
+        api_key: str | None,
+        *,
+        endpoint: str = "https://api.elevenlabs.io",
+        voice_id: str = "default",
+        model_id: str | None = None,
+        concurrency: int = 3,
+        cache: TieredCache | None = None,
+    ) -> None:
         self.api_key = api_key
+        self.endpoint = endpoint.rstrip("/")
+        self.voice_id = voice_id
+        self.model_id = model_id
+        self.concurrency = max(concurrency, 1)
+        self.cache = cache
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.api_key)
+
+    def _body(self, text: str) -> dict[str, Any]:
+        body: dict[str, Any] = {"text": text}
+        if self.model_id:
+            body["model_id"] = self.model_id
+        return body
+
+    def _headers(self) -> dict[str, str]:
+        return {"xi-api-key": self.api_key or ""}
+
+    def _cache_key(self, text: str) -> str:
+        return DiskCache.make_key("tts", normalize_phrase(text), self.voice_id, self.model_id)
+
+    async def _cached(self, text: str) -> bytes | None:
+        if self.cache is None:
+            return None
+        key = self._cache_key(text)
+        return self.cache.peek(key) or await asyncio.to_thread(self.cache.get, key)
+
+    async def _remember(self, text: str, audio: bytes) -> None:
+        if self.cache is None or not audio:
+            return
+        try:
+            await asyncio.to_thread(self.cache.set, self._cache_key(text), audio)
+        except OSError:
+            logger.warning("TTS cache write failed", exc_info=True)
 
     async def synthesize(self, text: str) -> bytes:
         if not self.api_key:
             raise RuntimeError("ELEVENLABS_API_KEY is not set")
+        cached = await self._cached(text)
+        if cached is not None:
+            return cached
+        # prewarm() caches sentences, which is what synthesize_stream() asks for; when every sentence of
+        # the phrase is there, the MP3 audio is joined instead of paying for the whole phrase again.
+        sentences = split_sentences(text)
+        if len(sentences) > 1:
+            parts = [await self._cached(sentence) for sentence in sentences]
+            if all(part is not None for part in parts):
+                audio = b"".join(parts)
+                await self._remember(text, audio)
+                return audio
         async with httpx.AsyncClient(timeout=30) as client:
             resp = await client.post(
-                "https://api.elevenlabs.io/v1/text-to-speech/default",
-                json={"text": text},
-                headers={"xi-api-key": self.api_key},
+                f"{self.endpoint}/v1/text-to-speech/{self.voice_id}",
+                json=self._body(normalize_phrase(text)),
+                headers=self._headers(),
             )
             resp.raise_for_status()
-            return resp.content
+        await self._remember(text, resp.content)
+        return resp.content
+
+    async def prewarm(self, phrases: list[str]) -> int:
+        if not self.api_key or self.cache is None:
+            return 0
+        sentences = {sentence for phrase in phrases for sentence in split_sentences(phrase)}
+        missing = [sentence for sentence in sentences if await self._cached(sentence) is None]
+        if not missing:
+            return 0
+        limit = asyncio.Semaphore(self.concurrency)
+
+        async def warm(client: httpx.AsyncClient, sentence: str) -> bool:
+            async with limit:
+                await self._fetch_sentence(client, sentence)
+            return True
+
+        async with httpx.AsyncClient(timeout=30) as client:
+            results = await asyncio.gather(
+                *(warm(client, sentence) for sentence in missing), return_exceptions=True
+            )
+        warmed = sum(1 for result in results if result is True)
+        logger.info("TTS cache pre-warmed %s phrase(s)", warmed)
+        return warmed
+
+    async def _fetch_sentence(
+        self,
+        client: httpx.AsyncClient,
+        sentence: str,
+        sink: asyncio.Queue[bytes | Exception | None] | None = None,
+    ) -> None:
+        cached = await self._cached(sentence)
+        if cached is not None:
+            if sink is not None:
+                await sink.put(cached)
+            return
+        audio: list[bytes] = []
+        async with client.stream(
+            "POST",
+            f"{self.endpoint}/v1/text-to-speech/{self.voice_id}/stream",
+            json=self._body(sentence),
+            headers=self._headers(),
+        ) as resp:
+            resp.raise_for_status()
+            async for chunk in resp.aiter_bytes():
+                if chunk:
+                    audio.append(chunk)
+                    if sink is not None:
+                        await sink.put(chunk)
+        await self._remember(sentence, b"".join(audio))
+
+    async def _stream_sentence(
+        self, client: httpx.AsyncClient, sentence: str, sink: asyncio.Queue[bytes | Exception | None]
+    ) -> None:
+        try:
+            await self._fetch_sentence(client, sentence, sink)
+        except Exception as exc:
+            await sink.put(exc)
+        finally:
+            await sink.put(None)
+
+    async def synthesize_stream(self, text: str) -> AsyncIterator[bytes]:
+        if not self.api_key:
+            raise RuntimeError("ELEVENLABS_API_KEY is not set")
+        sentences = split_sentences(text)
+        if not sentences:
+            return
+
+        async with httpx.AsyncClient(timeout=30) as client:
+            sinks: list[asyncio.Queue[bytes | Exception | None]] = []
+            tasks: list[asyncio.Task] = []
+
+            def launch(index: int) -> None:
+                sink: asyncio.Queue[bytes | Exception | None] = asyncio.Queue()
+                sinks.append(sink)
+                tasks.append(asyncio.create_task(self._stream_sentence(client, sentences[index], sink)))
+
+            # Keep `concurrency` sentences in flight; audio is emitted strictly in sentence order.
+            for index in range(min(self.concurrency, len(sentences))):
+                launch(index)
+            try:
+                for index in range(len(sentences)):
+                    sink = sinks[index]
+                    while True:
+                        item = await sink.get()
+                        if item is None:
+                            break
+                        if isinstance(item, Exception):
+                            raise item
+                        yield item
+                    if len(sinks) < len(sentences):
+                        launch(len(sinks))
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
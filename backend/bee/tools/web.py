@@ -1,6 +1,10 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+import re
+from collections.abc import AsyncIterator
+from html.parser import HTMLParser
 from typing import Any
 
 import httpx
@@ -8,6 +12,71 @@ import httpx
 
 logger = logging.getLogger(__name__)
 
+_SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "nav", "footer", "header", "form", "iframe"}
+_BLOCK_TAGS = {"p", "div", "section", "article", "main", "li", "br", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "pre"}
+_JS_SHELL_MARKERS = re.compile(
+    r"enable javascript|requires javascript|javascript is (?:disabled|required)|"
+    r"<div id=\"(?:root|app|__next|__nuxt)\">\s*</div>",
+    re.IGNORECASE,
+)
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.parts: list[str] = []
+        self.title = ""
+        self.description: str | None = None
+        self.scripts = 0
+        self._skip = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag == "script":
+            self.scripts += 1
+        if tag in _SKIP_TAGS:
+            self._skip += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag == "meta":
+            values = dict(attrs)
+            if (values.get("name") or values.get("property") or "").lower() in ("description", "og:description"):
+                self.description = self.description or values.get("content")
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in _SKIP_TAGS and self._skip:
+            self._skip -= 1
+        elif tag == "title":
+            self._in_title = False
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data: str) -> None:
+        if self._in_title:
+            self.title += data
+        elif not self._skip:
+            self.parts.append(data)
+
+
+def extract_html(html: str) -> dict[str, Any]:
+    parser = _TextExtractor()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception:
+        logger.debug("HTML extraction stopped early", exc_info=True)
+    lines = (" ".join(line.split()) for line in "".join(parser.parts).splitlines())
+    text = "\n".join(line for line in lines if line)
+    return {
+        "title": " ".join(parser.title.split()) or None,
+        "description": parser.description,
+        "text": text,
+        "scripts": parser.scripts,
+        "js_shell": bool(_JS_SHELL_MARKERS.search(html)),
+    }
+
 
 class WebTools:
     def __init__(self, api_key: str | None, endpoint: str) -> None:
@@ -62,23 +131,98 @@ class WebTools:
             )
         return results
 
-    async def scrape(self, url: str, *, max_chars: int = 20000) -> dict[str, Any]:
+    async def scrape(
+        self,
+        url: str,
+        *,
+        max_chars: int = 20000,
+        client: httpx.AsyncClient | None = None,
+        extract: bool = False,
+    ) -> dict[str, Any]:
         headers = {"User-Agent": "B.E.E. WebTools/1.0"}
         try:
-            async with httpx.AsyncClient(timeout=20) as client:
+            if client is not None:
                 resp = await client.get(url, headers=headers, follow_redirects=True)
+            else:
+                async with httpx.AsyncClient(timeout=20) as owned:
+                    resp = await owned.get(url, headers=headers, follow_redirects=True)
         except httpx.HTTPError:
             logger.warning("Scrape failed url=%s", url, exc_info=True)
             return {"url": url, "content": "", "status_code": None}
 
         content_type = resp.headers.get("content-type")
         text = resp.text
+        extracted: dict[str, Any] | None = None
+        if extract and "html" in (content_type or "text/html"):
+            extracted = await asyncio.to_thread(extract_html, text)
         if max_chars and len(text) > max_chars:
             text = text[:max_chars]
 
-        return {
+        result: dict[str, Any] = {
             "url": url,
             "status_code": resp.status_code,
             "content_type": content_type,
             "content": text,
         }
+        if extracted is not None:
+            if max_chars and len(extracted["text"]) > max_chars:
+                extracted["text"] = extracted["text"][:max_chars]
+            result["extracted"] = extracted
+        return result
+
+    async def research(
+        self,
+        query: str,
+        *,
+        count: int = 5,
+        scrape_top: int = 3,
+        max_chars: int = 20000,
+        country: str = "US",
+        search_lang: str = "en",
+        deadline_sec: float | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        hits = await self.search(query, count=count, country=country, search_lang=search_lang)
+        yield {"type": "search", "query": query, "results": hits}
+
+        targets = [(rank, hit) for rank, hit in enumerate(hits[: max(scrape_top, 0)]) if hit.get("url")]
+        if not targets:
+            yield {"type": "done", "scraped": 0, "dropped": []}
+            return
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + deadline_sec if deadline_sec else None
+        scraped = 0
+
+        async def fetch(rank: int, hit: dict[str, Any], client: httpx.AsyncClient) -> dict[str, Any]:
+            result = await self.scrape(hit["url"], max_chars=max_chars, client=client)
+            return {"type": "result", "rank": rank, "title": hit.get("title"), **result}
+
+        async with httpx.AsyncClient(timeout=20) as client:
+            pending = {
+                asyncio.create_task(fetch(rank, hit, client)): hit["url"] for rank, hit in targets
+            }
+            try:
+                while pending:
+                    timeout = None if deadline is None else max(deadline - loop.time(), 0)
+                    done, _ = await asyncio.wait(
+                        pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    if not done:
+                        break
+                    for task in done:
+                        url = pending.pop(task)
+                        scraped += 1
+                        if task.exception() is not None:
+                            logger.warning("Research scrape failed url=%s", url, exc_info=task.exception())
+                            yield {"type": "result", "url": url, "content": "", "status_code": None}
+                            continue
+                        yield task.result()
+            finally:
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        dropped = list(pending.values())
+        if dropped:
+            logger.info("Research deadline dropped %s scrape(s) for query=%s", len(dropped), query)
+        yield {"type": "done", "scraped": scraped, "dropped": dropped}
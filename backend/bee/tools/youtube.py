@@ -3,20 +3,123 @@ from __future__ import annotations
 import asyncio
 import logging
 import os
+import re
+import shutil
+import subprocess
 import tempfile
-from typing import Any
+import threading
+import time
+from collections.abc import AsyncIterator
+import concurrent.futures
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
+from urllib.parse import parse_qs, urlparse
 
-from openai import OpenAI
-from yt_dlp import YoutubeDL
+from bee.cache import DiskCache
+
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 
 logger = logging.getLogger(__name__)
 
+_NORMALIZE = re.compile(r"[^\w']+", re.UNICODE)
+_VIDEO_ID = re.compile(r"^[\w-]{11}$")
+# Trims trailing silence below -45 dB only: pauses inside the audio and leading silence are kept, so segment
+# "start" offsets stay on the video's timeline. areverse buffers the whole clip, hence the 16 kHz mono s16 first.
+_SILENCE_FILTER = (
+    "aformat=sample_fmts=s16:channel_layouts=mono:sample_rates=16000,"
+    "areverse,silenceremove=start_periods=1:start_threshold=-45dB,areverse"
+)
+
+
+def _speech_codec_args(bitrate: str) -> list[str]:
+    return ["-vn", "-ac", "1", "-ar", "16000", "-c:a", "libopus", "-b:a", bitrate]
+
+
+def preprocess_audio(src: str, dst: str, bitrate: str = "24k", trim_silence: bool = True) -> str:
+    args = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y", "-i", src]
+    if trim_silence:
+        args += ["-af", _SILENCE_FILTER]
+    args += _speech_codec_args(bitrate)
+    args.append(dst)
+    subprocess.run(args, check=True, capture_output=True)
+    return dst
+
+
+def probe_duration(path: str) -> float | None:
+    if not shutil.which("ffprobe"):
+        return None
+    proc = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", path],
+        capture_output=True,
+        text=True,
+    )
+    try:
+        return float(proc.stdout.strip())
+    except ValueError:
+        return None
+
+
+def _dir_bytes(path: str) -> int:
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
 
 class YouTubeTranscriber:
-    def __init__(self, api_key: str | None, model: str) -> None:
-        self.client = OpenAI(api_key=api_key) if api_key else None
+    def __init__(
+        self,
+        api_key: str | None,
+        model: str,
+        *,
+        segment_sec: int = 600,
+        overlap_sec: int = 5,
+        max_workers: int = 4,
+        retries: int = 2,
+        cache: DiskCache | None = None,
+        preprocess: bool = True,
+        audio_bitrate: str = "24k",
+        trim_silence: bool = True,
+        preprocess_workers: int = 2,
+    ) -> None:
+        self.api_key = api_key
+        self._client: OpenAI | None = None
+        self._client_lock = threading.Lock()
         self.model = model
+        self.segment_sec = segment_sec
+        self.overlap_sec = overlap_sec
+        self.retries = retries
+        self.cache = cache
+        self.preprocess = preprocess
+        self.audio_bitrate = audio_bitrate
+        self.trim_silence = trim_silence
+        self.preprocess_workers = max(preprocess_workers, 1)
+        self._process_pool: ProcessPoolExecutor | None = None
+        self._pool = ThreadPoolExecutor(max_workers=max(max_workers, 1), thread_name_prefix="transcribe")
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.api_key)
+
+    @property
+    def client(self) -> OpenAI | None:
+        # openai takes about a second to import, so it is loaded on the first transcription rather than at boot.
+        # Reached from the transcription pool threads, hence the lock.
+        if self._client is None and self.api_key:
+            with self._client_lock:
+                if self._client is None:
+                    from openai import OpenAI
+
+                    self._client = OpenAI(api_key=self.api_key)
+        return self._client
+
+    async def close(self) -> None:
+        # Queued work is dropped and running work is waited for, so no ffmpeg worker process outlives the server.
+        pools: list[ProcessPoolExecutor | ThreadPoolExecutor] = [self._pool]
+        if self._process_pool is not None:
+            pools.append(self._process_pool)
+            self._process_pool = None
+        for pool in pools:
+            await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
 
     @staticmethod
     def _to_url(video: str) -> str:
@@ -24,10 +127,34 @@ class YouTubeTranscriber:
             return video
         return f"https://www.youtube.com/watch?v={video}"
 
+    @staticmethod
+    def _video_id(video: str) -> str | None:
+        if not video.startswith("http://") and not video.startswith("https://"):
+            return video if _VIDEO_ID.match(video) else None
+        parsed = urlparse(video)
+        host = (parsed.hostname or "").lower()
+        if host.endswith("youtu.be"):
+            candidate = parsed.path.lstrip("/").split("/")[0]
+        elif "youtube" in host:
+            candidate = parse_qs(parsed.query).get("v", [""])[0]
+            parts = [part for part in parsed.path.split("/") if part]
+            if not candidate and len(parts) >= 2 and parts[0] in ("shorts", "embed", "live", "v"):
+                candidate = parts[1]
+        else:
+            return None
+        return candidate if _VIDEO_ID.match(candidate) else None
+
+    def _cache_key(self, video_id: str) -> str:
+        return DiskCache.make_key("youtube-transcript", video_id, self.model)
+
     @staticmethod
     def _download_audio(url: str, workdir: str) -> tuple[str, dict[str, Any]]:
+        from yt_dlp import YoutubeDL
+
         ydl_opts = {
             "format": "bestaudio/best",
+            # Speech needs little bandwidth: prefer the audio stream nearest 48 kbps, then the smallest file.
+            "format_sort": ["abr~48", "+size"],
             "outtmpl": os.path.join(workdir, "%(id)s.%(ext)s"),
             "noplaylist": True,
             "quiet": True,
@@ -48,23 +175,226 @@ class YouTubeTranscriber:
             )
         return result.text
 
-    async def transcribe(self, video: str) -> dict[str, Any]:
-        if not self.client:
-            return {"ok": False, "error": "OPENAI_API_KEY not set", "text": ""}
+    async def transcribe_audio(self, path: str) -> str:
+        # Shares the transcription pool with video segments, which bounds concurrent upload calls overall.
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self._transcribe_file, path)
 
-        url = self._to_url(video)
+    def _plan_segments(self, duration: float | None) -> list[tuple[float, float]]:
+        if not duration or duration <= self.segment_sec or not shutil.which("ffmpeg"):
+            return [(0.0, 0.0)]
+        step = max(self.segment_sec - self.overlap_sec, 1)
+        segments: list[tuple[float, float]] = []
+        start = 0.0
+        while start < duration:
+            length = min(self.segment_sec, duration - start)
+            segments.append((start, length))
+            if start + length >= duration:
+                break
+            start += step
+        return segments
+
+    def _cut_segment(self, path: str, start: float, length: float, out_path: str) -> str:
+        subprocess.run(
+            [
+                "ffmpeg",
+                "-hide_banner",
+                "-loglevel",
+                "error",
+                "-y",
+                "-ss",
+                f"{start:.3f}",
+                "-t",
+                f"{length:.3f}",
+                "-i",
+                path,
+                *_speech_codec_args(self.audio_bitrate),
+                out_path,
+            ],
+            check=True,
+            capture_output=True,
+        )
+        return out_path
+
+    async def _preprocess(self, path: str, workdir: str) -> str:
+        if not self.preprocess or not shutil.which("ffmpeg"):
+            return path
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=self.preprocess_workers)
+        dst = os.path.join(workdir, "speech.ogg")
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self._process_pool, preprocess_audio, path, dst, self.audio_bitrate, self.trim_silence
+            )
+        except Exception:
+            logger.warning("Audio pre-processing failed, uploading original", exc_info=True)
+            return path
+
+    def _transcribe_segment(
+        self, path: str, index: int, start: float, length: float, workdir: str, cancelled: threading.Event
+    ) -> tuple[str, int, float]:
+        # The stream was abandoned; stop before the next cut, upload or retry.
+        if cancelled.is_set():
+            raise RuntimeError("Transcription cancelled")
+        target = path
+        if length:
+            target = self._cut_segment(path, start, length, os.path.join(workdir, f"segment-{index:04d}.ogg"))
+        size = os.path.getsize(target)
+        attempt = 0
         try:
-            with tempfile.TemporaryDirectory() as tmpdir:
-                path, info = await asyncio.to_thread(self._download_audio, url, tmpdir)
-                text = await asyncio.to_thread(self._transcribe_file, path)
-        except Exception as exc:
-            logger.warning("YouTube transcription failed", exc_info=True)
-            return {"ok": False, "error": str(exc), "text": ""}
-
-        return {
-            "ok": True,
+            while True:
+                if cancelled.is_set():
+                    raise RuntimeError("Transcription cancelled")
+                began = time.perf_counter()
+                try:
+                    return self._transcribe_file(target), size, time.perf_counter() - began
+                except Exception:
+                    if attempt >= self.retries or cancelled.is_set():
+                        raise
+                    attempt += 1
+                    logger.info("Retrying transcription segment=%s attempt=%s", index, attempt)
+                    cancelled.wait(min(2**attempt, 10))
+        finally:
+            if target != path:
+                try:
+                    os.remove(target)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _stitch(texts: list[str], max_overlap_words: int = 60) -> str:
+        words: list[str] = []
+        for text in texts:
+            incoming = text.split()
+            if not incoming:
+                continue
+            if words:
+                tail = [_NORMALIZE.sub("", word).lower() for word in words[-max_overlap_words:]]
+                head = [_NORMALIZE.sub("", word).lower() for word in incoming[:max_overlap_words]]
+                for size in range(min(len(tail), len(head)), 0, -1):
+                    if tail[-size:] == head[:size]:
+                        incoming = incoming[size:]
+                        break
+            words.extend(incoming)
+        return " ".join(words)
+
+    async def transcribe_stream(self, video: str) -> AsyncIterator[dict[str, Any]]:
+        if not self.enabled:
+            yield {"type": "done", "ok": False, "error": "OPENAI_API_KEY not set", "text": ""}
+            return
+
+        url = self._to_url(video)
+        video_id = self._video_id(video)
+        if self.cache is not None and video_id:
+            cached = await asyncio.to_thread(self.cache.get_json, self._cache_key(video_id))
+            if cached:
+                yield {"type": "done", **cached, "cached": True}
+                return
+
+        metrics: dict[str, Any] = {}
+        with tempfile.TemporaryDirectory() as tmpdir:
+            began = time.perf_counter()
+            try:
+                source, info = await asyncio.to_thread(self._download_audio, url, tmpdir)
+            except Exception as exc:
+                logger.warning("YouTube download failed", exc_info=True)
+                yield {"type": "done", "ok": False, "error": str(exc), "text": ""}
+                return
+            metrics["download_sec"] = round(time.perf_counter() - began, 3)
+            metrics["download_bytes"] = os.path.getsize(source)
+
+            began = time.perf_counter()
+            path = await self._preprocess(source, tmpdir)
+            metrics["preprocess_sec"] = round(time.perf_counter() - began, 3)
+            metrics["temp_disk_peak_bytes"] = await asyncio.to_thread(_dir_bytes, tmpdir)
+            duration = info.get("duration")
+            if path != source:
+                os.remove(source)
+                duration = await asyncio.to_thread(probe_duration, path) or duration
+            metrics["processed_bytes"] = os.path.getsize(path)
+
+            segments = self._plan_segments(duration)
+            yield {
+                "type": "start",
+                "video_id": info.get("id"),
+                "title": info.get("title"),
+                "url": url,
+                "segments": len(segments),
+            }
+
+            cancelled = threading.Event()
+            futures: list[concurrent.futures.Future] = []
+
+            async def run(idx: int, start: float, length: float) -> tuple[int, Any, Exception | None]:
+                future = self._pool.submit(self._transcribe_segment, path, idx, start, length, tmpdir, cancelled)
+                futures.append(future)
+                try:
+                    outcome = await asyncio.wrap_future(future)
+                except Exception as exc:
+                    return idx, None, exc
+                return idx, outcome, None
+
+            tasks = [asyncio.create_task(run(idx, start, length)) for idx, (start, length) in enumerate(segments)]
+            texts: list[str | None] = [None] * len(segments)
+            errors: dict[int, str] = {}
+            metrics["upload_bytes"] = 0
+            metrics["transcribe_sec"] = 0.0
+            began = time.perf_counter()
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    idx, outcome, exc = await next_done
+                    if exc is not None:
+                        logger.warning("Transcription segment failed segment=%s", idx, exc_info=exc)
+                        errors[idx] = str(exc)
+                        yield {"type": "segment", "index": idx, "ok": False, "error": str(exc)}
+                        continue
+                    text, uploaded, elapsed = outcome
+                    texts[idx] = text
+                    metrics["upload_bytes"] += uploaded
+                    metrics["transcribe_sec"] += elapsed
+                    yield {"type": "segment", "index": idx, "ok": True, "start": segments[idx][0], "text": text}
+            finally:
+                cancelled.set()
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                # Cancelling a task does not stop its thread; segments still cutting or uploading must
+                # finish before the temporary directory is removed under them.
+                for future in futures:
+                    future.cancel()
+                await asyncio.to_thread(concurrent.futures.wait, futures)
+            metrics["transcribe_wall_sec"] = round(time.perf_counter() - began, 3)
+
+        metrics["transcribe_sec"] = round(metrics["transcribe_sec"], 3)
+        metrics["bytes_saved"] = metrics["download_bytes"] - metrics["upload_bytes"]
+        logger.info("YouTube transcription video_id=%s metrics=%s", info.get("id"), metrics)
+        ok = not errors
+        result: dict[str, Any] = {
+            "type": "done",
+            "ok": ok,
             "video_id": info.get("id"),
             "title": info.get("title"),
             "url": url,
-            "text": text,
+            "text": self._stitch([text or "" for text in texts]),
+            "segments": len(segments),
         }
+        if errors:
+            result["error"] = f"{len(errors)} of {len(segments)} segment(s) failed"
+            result["failed_segments"] = sorted(errors)
+        elif self.cache is not None:
+            entry = {key: value for key, value in result.items() if key != "type"}
+            for key_id in {video_id, info.get("id")} - {None}:
+                try:
+                    await asyncio.to_thread(self.cache.set_json, self._cache_key(key_id), entry)
+                except OSError:
+                    logger.warning("Transcript cache write failed video_id=%s", key_id, exc_info=True)
+        result["metrics"] = metrics
+        yield result
+
+    async def transcribe(self, video: str) -> dict[str, Any]:
+        result: dict[str, Any] = {"ok": False, "error": "no result", "text": ""}
+        async for event in self.transcribe_stream(video):
+            if event["type"] == "done":
+                result = {key: value for key, value in event.items() if key != "type"}
+        return result
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any
+
+from bee.config import Settings
+
+
+_BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Runs in a fresh interpreter each time, so nothing is already imported or cached in memory.
+_CHILD = "import json, main; print(json.dumps(main.app.state.import_profile))"
+
+
+def _cold_start() -> tuple[float, dict[str, Any]]:
+    began = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", _CHILD], capture_output=True, text=True, cwd=_BACKEND, check=True)
+    elapsed_ms = (time.perf_counter() - began) * 1000
+    return elapsed_ms, json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cold start of main.py in fresh interpreters against a time budget")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=None,
+        help="median cold start allowed; defaults to BEE_STARTUP_BUDGET_MS",
+    )
+    args = parser.parse_args()
+    budget_ms = args.budget_ms if args.budget_ms is not None else Settings().startup_budget_ms
+
+    _cold_start()  # writes bytecode once so every measured run sees the same cache state
+
+    samples: list[float] = []
+    profile: dict[str, Any] = {}
+    for _ in range(max(args.runs, 1)):
+        elapsed_ms, profile = _cold_start()
+        samples.append(elapsed_ms)
+
+    median_ms = statistics.median(samples)
+    report = {
+        "benchmark": "cold_start",
+        "python": sys.version.split()[0],
+        "runs": len(samples),
+        "budget_ms": budget_ms,
+        "median_ms": round(median_ms, 1),
+        "max_ms": round(max(samples), 1),
+        "imports_ms": profile.get("total_ms"),
+        "slowest_imports": profile.get("modules", [])[:10],
+    }
+    print(json.dumps(report, indent=2))
+    if median_ms > budget_ms:
+        print(f"cold start {median_ms:.0f} ms is over the {budget_ms:.0f} ms budget", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+from collections.abc import AsyncIterator
+from typing import Any
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+# Stand-in for an Ollama node: a cold model pays `load_sec` once (until keep_alive lapses), at most
+# `parallel` requests decode at a time (like OLLAMA_NUM_PARALLEL), each waits `ttft_sec` for prompt
+# evaluation and then emits tokens at `tokens_per_sec`.
+def create_fake_ollama(
+    *,
+    load_sec: float = 1.5,
+    ttft_sec: float = 0.12,
+    tokens_per_sec: float = 60.0,
+    tokens: int = 48,
+    parallel: int = 2,
+    error_rate: float = 0.0,
+    seed: int = 0,
+) -> FastAPI:
+    app = FastAPI(title="fake-ollama")
+    rng = random.Random(seed)
+    slots = asyncio.Semaphore(max(parallel, 1))
+    loaded: dict[str, float] = {}
+    loading: dict[str, asyncio.Lock] = {}
+
+    def keep_alive_sec(value: Any) -> float:
+        if isinstance(value, (int, float)):
+            return float(value)
+        if isinstance(value, str) and value.endswith("s") and value[:-1].isdigit():
+            return float(value[:-1])
+        if isinstance(value, str) and value.endswith("m") and value[:-1].isdigit():
+            return float(value[:-1]) * 60
+        return 300.0
+
+    async def ensure_loaded(model: str, keep_alive: Any) -> float:
+        lock = loading.setdefault(model, asyncio.Lock())
+        async with lock:
+            waited = 0.0
+            if loaded.get(model, 0.0) <= time.monotonic():
+                await asyncio.sleep(load_sec)
+                waited = load_sec
+            loaded[model] = time.monotonic() + keep_alive_sec(keep_alive)
+            return waited
+
+    async def decode(count: int) -> AsyncIterator[str]:
+        await asyncio.sleep(ttft_sec)
+        for index in range(count):
+            if index:
+                await asyncio.sleep(1 / tokens_per_sec)
+            yield f"tok{index} "
+
+    def summary(model: str, count: int, load: float, began: float) -> dict[str, Any]:
+        return {
+            "model": model,
+            "done": True,
+            "done_reason": "stop",
+            "eval_count": count,
+            "eval_duration": int(max(count - 1, 1) / tokens_per_sec * 1e9),
+            "prompt_eval_duration": int(ttft_sec * 1e9),
+            "load_duration": int(load * 1e9),
+            "total_duration": int((time.perf_counter() - began) * 1e9),
+        }
+
+    @app.get("/api/ps")
+    async def ps() -> dict:
+        now = time.monotonic()
+        return {"models": [{"name": model, "model": model} for model, expires in loaded.items() if expires > now]}
+
+    @app.post("/api/embed")
+    async def embed(payload: dict) -> dict:
+        text = str(payload.get("input", "")).lower()
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        return {"model": payload.get("model"), "embeddings": [[(byte - 128) / 128 for byte in digest]]}
+
+    @app.post("/api/generate", response_model=None)
+    async def generate(request: Request) -> StreamingResponse | JSONResponse | dict:
+        payload = await request.json()
+        began = time.perf_counter()
+        model = payload.get("model") or "fake"
+        load = await ensure_loaded(model, payload.get("keep_alive"))
+        if "prompt" not in payload:
+            return {"model": model, "done": True, "done_reason": "load", "load_duration": int(load * 1e9)}
+        if error_rate and rng.random() < error_rate:
+            return JSONResponse({"error": "simulated failure"}, status_code=500)
+        count = int((payload.get("options") or {}).get("num_predict") or tokens)
+
+        if not payload.get("stream", True):
+            async with slots:
+                text = "".join([token async for token in decode(count)])
+            return {"response": text, **summary(model, count, load, began)}
+
+        async def lines() -> AsyncIterator[str]:
+            async with slots:
+                async for token in decode(count):
+                    yield json.dumps({"model": model, "response": token, "done": False}) + "\n"
+            yield json.dumps({"response": "", **summary(model, count, load, began)}) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in for an Ollama node")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv("FAKE_OLLAMA_PORT", "11500")))
+    parser.add_argument("--load", type=float, default=1.5)
+    parser.add_argument("--ttft", type=float, default=0.12)
+    parser.add_argument("--tokens-per-sec", type=float, default=60.0)
+    parser.add_argument("--parallel", type=int, default=2)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    app = create_fake_ollama(
+        load_sec=args.load,
+        ttft_sec=args.ttft,
+        tokens_per_sec=args.tokens_per_sec,
+        parallel=args.parallel,
+        error_rate=args.error_rate,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+from collections.abc import AsyncIterator
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+
+
+# Stand-in for the ElevenLabs text-to-speech API: every request pays a fixed startup latency,
+# then "audio" is produced at a steady characters-per-second rate.
+def create_fake_tts(
+    *,
+    latency_sec: float = 0.25,
+    chars_per_sec: float = 400.0,
+    bytes_per_char: int = 160,
+    chunk_bytes: int = 4096,
+) -> FastAPI:
+    app = FastAPI(title="fake-tts")
+
+    async def render(text: str) -> AsyncIterator[bytes]:
+        await asyncio.sleep(latency_sec)
+        remaining = max(len(text), 1) * bytes_per_char
+        per_chunk_sec = chunk_bytes / bytes_per_char / chars_per_sec
+        while remaining > 0:
+            size = min(chunk_bytes, remaining)
+            await asyncio.sleep(per_chunk_sec * size / chunk_bytes)
+            remaining -= size
+            yield b"\x00" * size
+
+    @app.post("/v1/text-to-speech/{voice_id}")
+    async def synthesize(voice_id: str, payload: dict) -> Response:
+        audio = b"".join([chunk async for chunk in render(payload.get("text", ""))])
+        return Response(audio, media_type="audio/mpeg")
+
+    @app.post("/v1/text-to-speech/{voice_id}/stream")
+    async def synthesize_stream(voice_id: str, payload: dict) -> StreamingResponse:
+        return StreamingResponse(render(payload.get("text", "")), media_type="audio/mpeg")
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in for the ElevenLabs TTS API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv("FAKE_TTS_PORT", "8790")))
+    parser.add_argument("--latency", type=float, default=0.25)
+    parser.add_argument("--chars-per-sec", type=float, default=400.0)
+    args = parser.parse_args()
+    app = create_fake_tts(latency_sec=args.latency, chars_per_sec=args.chars_per_sec)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
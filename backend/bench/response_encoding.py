@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import httpx
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+
+from bee.compression import CompressionMiddleware, brotli
+from bee.models import GoalState, StatusResponse
+from bee.responses import FastJSONResponse, FastRoute, dumps
+
+
+WORDS = (
+    "swarm memory heartbeat goal transcript research agent model token latency cache browser "
+    "queue node summary evidence source page signal pattern hive context window embedding"
+).split()
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+# Shapes follow what the real endpoints return: EvermemOS search hits, a scraped page, a segmented transcript.
+def _payloads(scale: int) -> dict[str, Any]:
+    rng = random.Random(7)
+    began = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    search = {
+        "ok": True,
+        "result": {
+            "memories": [
+                {
+                    "memory_id": f"mem-{index}",
+                    "score": rng.random(),
+                    "timestamp": (began + timedelta(minutes=index)).isoformat(),
+                    "content": _text(rng, 120),
+                    "metadata": {"group_id": "bee", "sender": "bee", "tags": [rng.choice(WORDS) for _ in range(4)]},
+                }
+                for index in range(40 * scale)
+            ]
+        },
+    }
+    scrape = {
+        "ok": True,
+        "url": "https://example.com/article",
+        "title": "Swarm scheduling notes",
+        "content": "\n\n".join(_text(rng, 90) for _ in range(60 * scale)),
+        "links": [f"https://example.com/page/{index}" for index in range(50 * scale)],
+    }
+    transcript = {
+        "ok": True,
+        "video_id": "dQw4w9WgXcQ",
+        "segments": [
+            {"start": index * 4.2, "end": index * 4.2 + 4.0, "text": _text(rng, 14)} for index in range(400 * scale)
+        ],
+    }
+    status = StatusResponse(
+        heartbeat_running=True,
+        heartbeat_interval_sec=30,
+        risk_tolerance=5,
+        memory_goals=GoalState(goals=["tidy memory", "research swarms", "summarize transcripts"]),
+        personality_summary=_text(rng, 40),
+        evermem_enabled=True,
+        evermem_endpoint="http://localhost:8001",
+        evermem_group_id="bee",
+        last_tick=began.isoformat(),
+    )
+    return {"evermem_search": search, "web_scrape": scrape, "transcript": transcript, "status": status}
+
+
+def _app(payloads: dict[str, Any], *, fast: bool, minimum_size: int) -> FastAPI:
+    if fast:
+        app = FastAPI(default_response_class=FastJSONResponse)
+        app.router.route_class = FastRoute
+        app.add_middleware(CompressionMiddleware, minimum_size=minimum_size)
+    else:
+        app = FastAPI()
+    for name, payload in payloads.items():
+        _route(app, name, payload)
+    return app
+
+
+def _route(app: FastAPI, name: str, payload: Any) -> None:
+    if isinstance(payload, StatusResponse):
+
+        @app.get(f"/{name}", response_model=StatusResponse)
+        async def model_endpoint() -> StatusResponse:
+            return payload
+
+    else:
+
+        @app.get(f"/{name}")
+        async def dict_endpoint() -> dict:
+            return payload
+
+
+def _median_ms(samples: list[float]) -> float:
+    return round(statistics.median(samples) * 1000, 3)
+
+
+def _serialize(payload: Any, runs: int) -> dict[str, float]:
+    before: list[float] = []
+    after: list[float] = []
+    for _ in range(runs):
+        began = time.perf_counter()
+        json.dumps(jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":"))
+        before.append(time.perf_counter() - began)
+        began = time.perf_counter()
+        dumps(payload)
+        after.append(time.perf_counter() - began)
+    return {"before_ms": _median_ms(before), "after_ms": _median_ms(after)}
+
+
+async def _request(app: FastAPI, path: str, accept_encoding: str, runs: int) -> dict[str, Any]:
+    samples: list[float] = []
+    wire = 0
+    encoding = None
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for index in range(runs + 1):
+            began = time.perf_counter()
+            async with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+                # Raw bytes, so the client never spends time decompressing inside the measurement.
+                wire = sum([len(chunk) async for chunk in response.aiter_raw()])
+                encoding = response.headers.get("content-encoding")
+            if index:
+                samples.append(time.perf_counter() - began)
+    return {"ms": _median_ms(samples), "bytes": wire, "encoding": encoding}
+
+
+async def _bench(args: argparse.Namespace) -> list[dict[str, Any]]:
+    payloads = _payloads(args.scale)
+    before_app = _app(payloads, fast=False, minimum_size=args.minimum_size)
+    after_app = _app(payloads, fast=True, minimum_size=args.minimum_size)
+    encodings = ["gzip", "br"] if brotli is not None else ["gzip"]
+
+    rows = []
+    for name, payload in payloads.items():
+        row: dict[str, Any] = {"payload": name, "serialize": _serialize(payload, args.runs)}
+        row["before"] = await _request(before_app, f"/{name}", "identity", args.runs)
+        row["after"] = await _request(after_app, f"/{name}", "identity", args.runs)
+        for encoding in encodings:
+            row[f"after_{encoding}"] = await _request(after_app, f"/{name}", encoding, args.runs)
+        rows.append(row)
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Response serialization time and bytes on the wire: FastAPI defaults vs FastJSONResponse + compression"
+    )
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--scale", type=int, default=4, help="payload size multiplier")
+    parser.add_argument("--minimum-size", type=int, default=1024)
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args()
+
+    report = {
+        "benchmark": "response_encoding",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "brotli": brotli is not None,
+        "config": {"runs": args.runs, "scale": args.scale, "minimum_size": args.minimum_size},
+        "payloads": asyncio.run(_bench(args)),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+from bee.metrics import percentile
+from bee.swarm.ollama_swarm import OllamaSwarm, SwarmError
+from bench._util import free_port, serve
+from bench.fake_ollama import create_fake_ollama
+
+
+MODEL = "bench-model"
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def _one(swarm: OllamaSwarm, prompt: str) -> dict[str, Any]:
+    began = time.perf_counter()
+    try:
+        async for event in swarm.generate_stream(prompt, model=MODEL):
+            if event["type"] == "done":
+                return {"ok": True, "latency_ms": (time.perf_counter() - began) * 1000, **event}
+    except SwarmError as exc:
+        return {"ok": False, "latency_ms": (time.perf_counter() - began) * 1000, "error": str(exc)}
+    return {"ok": False, "latency_ms": (time.perf_counter() - began) * 1000, "error": "no done event"}
+
+
+async def _level(endpoints: list[str], concurrency: int, requests: int, node_concurrency: int) -> dict[str, Any]:
+    swarm = OllamaSwarm(endpoints, MODEL, max_concurrency=node_concurrency, retries=1)
+    limit = asyncio.Semaphore(concurrency)
+
+    async def run(index: int) -> dict[str, Any]:
+        async with limit:
+            return await _one(swarm, f"bench prompt {concurrency}-{index}")
+
+    began = time.perf_counter()
+    results = await asyncio.gather(*(run(index) for index in range(requests)))
+    elapsed = time.perf_counter() - began
+    await swarm.close()
+
+    ok = [result for result in results if result["ok"]]
+    latency = [result["latency_ms"] for result in ok]
+    ttft = [result["ttft_ms"] for result in ok if result.get("ttft_ms") is not None]
+    queue_wait = [result["queue_wait_ms"] for result in ok if result.get("queue_wait_ms") is not None]
+    tokens = sum(result.get("tokens") or 0 for result in ok)
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": len(results) - len(ok),
+        "error_rate": round((len(results) - len(ok)) / len(results), 4) if results else None,
+        "elapsed_sec": round(elapsed, 3),
+        "throughput_rps": round(len(ok) / elapsed, 3) if elapsed else None,
+        "tokens_per_sec": round(tokens / elapsed, 1) if elapsed else None,
+        "latency_p50_ms": percentile(latency, 50),
+        "latency_p95_ms": percentile(latency, 95),
+        "latency_p99_ms": percentile(latency, 99),
+        "ttft_p50_ms": percentile(ttft, 50),
+        "ttft_p95_ms": percentile(ttft, 95),
+        "ttft_p99_ms": percentile(ttft, 99),
+        "queue_wait_p95_ms": percentile(queue_wait, 95),
+    }
+
+
+async def _bench(args: argparse.Namespace, endpoints: list[str]) -> dict[str, Any]:
+    # One request per node pays the simulated model load, so the levels measure warm steady state.
+    warmers = [OllamaSwarm([endpoint], MODEL) for endpoint in endpoints]
+    began = time.perf_counter()
+    await asyncio.gather(*(warmer.prewarm([MODEL]) for warmer in warmers))
+    cold_ms = round((time.perf_counter() - began) * 1000, 1)
+    for warmer in warmers:
+        await warmer.close()
+
+    levels = []
+    for concurrency in args.levels:
+        levels.append(await _level(endpoints, concurrency, max(args.requests, concurrency), args.node_concurrency))
+    return {"cold_start_ms": cold_ms, "levels": levels}
+
+
+def _compare(current: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    regressions: list[str] = []
+    previous = {level["concurrency"]: level for level in baseline.get("levels", [])}
+    for level in current["levels"]:
+        before = previous.get(level["concurrency"])
+        if before is None:
+            continue
+        if before.get("throughput_rps") and level["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"c={level['concurrency']} throughput {before['throughput_rps']} -> {level['throughput_rps']} rps"
+            )
+        for key in ("latency_p95_ms", "ttft_p95_ms"):
+            if before.get(key) and level.get(key) and level[key] > before[key] * (1 + tolerance):
+                regressions.append(f"c={level['concurrency']} {key} {before[key]} -> {level[key]}")
+        if level["error_rate"] > (before.get("error_rate") or 0) + tolerance:
+            regressions.append(f"c={level['concurrency']} error_rate {before.get('error_rate')} -> {level['error_rate']}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="OllamaSwarm throughput at stepped concurrency against bench.fake_ollama")
+    parser.add_argument("--nodes", type=int, default=2)
+    parser.add_argument("--levels", type=lambda value: [int(item) for item in value.split(",")], default=[1, 2, 4, 8, 16])
+    parser.add_argument("--requests", type=int, default=32, help="requests per level")
+    parser.add_argument("--node-concurrency", type=int, default=2)
+    parser.add_argument("--parallel", type=int, default=2, help="decode slots per fake node")
+    parser.add_argument("--load", type=float, default=1.5)
+    parser.add_argument("--ttft", type=float, default=0.12)
+    parser.add_argument("--tokens-per-sec", type=float, default=60.0)
+    parser.add_argument("--tokens", type=int, default=48)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", help="previous JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed relative regression vs --baseline")
+    args = parser.parse_args()
+
+    servers = []
+    endpoints = []
+    for index in range(args.nodes):
+        port = free_port()
+        app = create_fake_ollama(
+            load_sec=args.load,
+            ttft_sec=args.ttft,
+            tokens_per_sec=args.tokens_per_sec,
+            tokens=args.tokens,
+            parallel=args.parallel,
+            error_rate=args.error_rate,
+            seed=index,
+        )
+        servers.append(serve(app, port))
+        endpoints.append(f"http://127.0.0.1:{port}")
+    try:
+        result = asyncio.run(_bench(args, endpoints))
+    finally:
+        for server in servers:
+            server.should_exit = True
+
+    # Everything that shapes the numbers is recorded so runs from different commits can be lined up.
+    report = {
+        "benchmark": "swarm_throughput",
+        "revision": _git_revision(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "config": {
+            key: getattr(args, key)
+            for key in (
+                "nodes", "levels", "requests", "node_concurrency", "parallel",
+                "load", "ttft", "tokens_per_sec", "tokens", "error_rate",
+            )
+        },
+        **result,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text + "\n")
+    print(text)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        if baseline.get("config") != report["config"]:
+            print("warning: baseline was recorded with a different config", file=sys.stderr)
+        regressions = _compare(report, baseline, args.tolerance)
+        for line in regressions:
+            print(f"regression: {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
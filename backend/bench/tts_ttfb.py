@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+
+from bee.tools.voice import VoiceClient
+from bench._util import free_port, serve
+from bench.fake_tts import create_fake_tts
+
+
+SAMPLE_TEXT = (
+    "B.E.E. online. Heartbeat is running every thirty seconds. "
+    "Goal one is to keep the hive memory tidy and deduplicated. "
+    "Goal two is to research the latest swarm scheduling papers. "
+    "Goal three is to summarize yesterday's transcripts before noon. "
+    "Risk tolerance is five, and no actions are currently halted."
+)
+
+
+async def _measure(client: VoiceClient, text: str, runs: int) -> dict:
+    blocking: list[float] = []
+    ttfb: list[float] = []
+    total: list[float] = []
+    for _ in range(runs):
+        began = time.perf_counter()
+        await client.synthesize(text)
+        blocking.append(time.perf_counter() - began)
+
+        began = time.perf_counter()
+        first = None
+        async for _chunk in client.synthesize_stream(text):
+            if first is None:
+                first = time.perf_counter() - began
+        ttfb.append(first or 0.0)
+        total.append(time.perf_counter() - began)
+
+    def avg(values: list[float]) -> float:
+        return round(sum(values) / len(values) * 1000, 1)
+
+    return {
+        "chars": len(text),
+        "runs": runs,
+        "concurrency": client.concurrency,
+        "synthesize_ms": avg(blocking),
+        "stream_ttfb_ms": avg(ttfb),
+        "stream_total_ms": avg(total),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time-to-first-byte: VoiceClient.synthesize vs synthesize_stream")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.25)
+    parser.add_argument("--chars-per-sec", type=float, default=400.0)
+    args = parser.parse_args()
+
+    port = free_port()
+    server = serve(create_fake_tts(latency_sec=args.latency, chars_per_sec=args.chars_per_sec), port)
+    client = VoiceClient("bench", endpoint=f"http://127.0.0.1:{port}", concurrency=args.concurrency)
+    try:
+        print(json.dumps(asyncio.run(_measure(client, SAMPLE_TEXT, args.runs)), indent=2))
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,19 @@
+from bee.importtime import ImportProfiler
+
+profiler = ImportProfiler().start()
+
 import uvicorn
 from dotenv import find_dotenv, load_dotenv
 
 from bee.app import create_app
 
+profiler.stop()
+
 
 load_dotenv(find_dotenv())
 
 app = create_app()
+app.state.import_profile = profiler.report()
 
 if __name__ == "__main__":
     uvicorn.run(app, host=app.state.settings.host, port=app.state.settings.port)
@@ -1,3 +1,4 @@
+import json
 import os
 import sys
 import httpx
@@ -42,6 +43,30 @@ def check_web_search() -> bool:
         return False
 
 
+def check_web_research() -> bool:
+    if not os.getenv("BRAVE_SEARCH_API_KEY"):
+        _print("web research", True, "skipped (BRAVE_SEARCH_API_KEY not set)")
+        return True
+    try:
+        events = []
+        with httpx.stream(
+            "POST",
+            f"{BASE_URL}/api/web/research",
+            json={"query": "B.E.E. agent platform", "scrape_top": 2, "deadline_sec": 15},
+            timeout=30,
+        ) as resp:
+            for line in resp.iter_lines():
+                if line:
+                    events.append(json.loads(line))
+        done = events[-1] if events else {}
+        ok = resp.status_code == 200 and done.get("type") == "done"
+        _print("web research", ok, f"scraped={done.get('scraped')} dropped={len(done.get('dropped', []))}")
+        return ok
+    except Exception as exc:
+        _print("web research", False, str(exc))
+        return False
+
+
 def check_youtube_transcribe() -> bool:
     if not os.getenv("OPENAI_API_KEY"):
         _print("youtube transcribe", True, "skipped (OPENAI_API_KEY not set)")
@@ -92,6 +117,7 @@ def main() -> int:
     checks = [
         check_health(),
         check_web_search(),
+        check_web_research(),
         check_youtube_transcribe(),
         check_browser_use(),
     ]